@@ -0,0 +1,94 @@
+# /app/analysis_budget.py
+"""
+Per-request time budget for the recognizer stage.
+
+A pathological input must not tie up the (single) analyzer worker until
+gunicorn kills it. Each /analyze request runs inside analysis_budget(); once
+the deadline has passed, remaining recognizers are skipped and regex
+patterns raise TimeoutError (Presidio logs and skips the pattern). The
+request then returns what was found so far, flagged as partial.
+
+ANALYSIS_BUDGET_SECONDS (default 20, below gunicorn's 30s worker timeout)
+is the server-side maximum; 0 disables the budget.
+"""
+
+import contextvars
+import functools
+import logging
+import math
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional
+
+logger = logging.getLogger("presidio-analyzer")
+
+ANALYSIS_BUDGET_SECONDS = float(os.environ.get("ANALYSIS_BUDGET_SECONDS", "20"))
+
+
+@dataclass
+class Budget:
+    deadline: float
+    skipped: List[str] = field(default_factory=list)
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.skipped)
+
+    def remaining(self) -> float:
+        return self.deadline - time.monotonic()
+
+
+_current: contextvars.ContextVar[Optional[Budget]] = contextvars.ContextVar("analysis_budget", default=None)
+
+
+@contextmanager
+def analysis_budget(seconds: float, started: Optional[float] = None) -> Iterator[Optional[Budget]]:
+    """Activate a budget of `seconds` from `started` (time.monotonic()); <= 0 means unlimited."""
+    budget = Budget((started or time.monotonic()) + seconds) if seconds > 0 else None
+    token = _current.set(budget)
+    try:
+        yield budget
+    finally:
+        _current.reset(token)
+
+
+def request_budget(requested, maximum: float = ANALYSIS_BUDGET_SECONDS) -> float:
+    """
+    Budget for a request's "time_budget_seconds" (None = server maximum).
+
+    Requests may only lower the maximum; anything but a positive finite number
+    raises TypeError (-> 400), so clients cannot switch the budget off.
+    """
+    if requested is None:
+        return maximum
+    try:
+        seconds = float(requested)
+    except (TypeError, ValueError):
+        seconds = math.nan
+    if isinstance(requested, bool) or not math.isfinite(seconds) or seconds <= 0:
+        raise TypeError(f"time_budget_seconds must be a positive number, got {requested!r}")
+    return min(seconds, maximum) if maximum > 0 else seconds
+
+
+def current_budget() -> Optional[Budget]:
+    return _current.get()
+
+
+def _budgeted(analyze, name: str):
+    @functools.wraps(analyze)
+    def wrapper(*args, **kwargs):
+        budget = _current.get()
+        if budget is not None and budget.remaining() <= 0:
+            budget.skipped.append(name)
+            return []
+        return analyze(*args, **kwargs)
+
+    return wrapper
+
+
+def install_budget_checks(registry) -> None:
+    """Check the budget before each registered recognizer runs."""
+    for recognizer in registry.recognizers:
+        recognizer.analyze = _budgeted(recognizer.analyze, recognizer.name)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Build the PLZ validity bitmap and PLZ -> locality table from OpenPLZ streets.csv.
+
+Runs at image build time (see Dockerfile) next to the street gazetteer; the
+runtime only loads the two small output files (see plz_bitmap.py).
+"""
+import csv
+import sys
+import unicodedata
+from collections import defaultdict
+from pathlib import Path
+
+from plz_bitmap import PlzBitmap, PLZ_BITMAP_PATH, PLZ_CITIES_PATH
+
+STREETS_CSV_PATH = Path("/app/data/streets.csv")
+
+
+def load_postal_codes(path: Path):
+    """Collect valid PLZ and their (casefolded) localities from streets.csv."""
+    if not path.is_file():
+        raise FileNotFoundError(f"Street CSV not found: {path}")
+
+    cities = defaultdict(set)
+    with path.open(encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f, delimiter=",", quotechar='"')
+        for column in ("PostalCode", "Locality"):
+            if column not in reader.fieldnames:
+                raise ValueError(f"'{column}' column not found, columns: {reader.fieldnames}")
+
+        for row in reader:
+            plz = (row.get("PostalCode") or "").strip()
+            if len(plz) != 5 or not (plz.isascii() and plz.isdigit()):
+                continue
+            locality = unicodedata.normalize("NFC", (row.get("Locality") or "").strip()).casefold()
+            names = cities[int(plz)]
+            if locality:
+                names.add(locality)
+
+    return {code: tuple(sorted(names)) for code, names in cities.items()}
+
+
+def main(argv=None) -> int:
+    args = argv if argv is not None else sys.argv[1:]
+    source = Path(args[0]) if len(args) > 0 else STREETS_CSV_PATH
+    bitmap_path = Path(args[1]) if len(args) > 1 else PLZ_BITMAP_PATH
+    cities_path = Path(args[2]) if len(args) > 2 else PLZ_CITIES_PATH
+
+    print(f"[build] Reading postal codes from {source} ...")
+    cities = load_postal_codes(source)
+    bitmap = PlzBitmap.from_codes(cities, cities)
+    bitmap.write(bitmap_path, cities_path)
+    print(f"[build] {len(bitmap):,} valid PLZ -> {bitmap_path} ({bitmap_path.stat().st_size:,} bytes), {cities_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
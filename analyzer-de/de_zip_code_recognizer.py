@@ -0,0 +1,87 @@
+# /app/de_zip_code_recognizer.py
+"""
+DE_ZIP_CODE recognizer backed by the PLZ bitmap.
+
+The YAML-defined DeZipCodeRecognizer flags every five-digit number (lab
+values, case numbers, dosages). This subclass keeps its patterns but
+- drops candidates that are not a real German PLZ (bitmap, O(1)),
+- raises the score when a known locality for that PLZ follows ("10115 Berlin").
+
+create_app() swaps it in for the YAML recognizer at startup.
+"""
+
+import logging
+from typing import List, Optional
+
+from presidio_analyzer import PatternRecognizer, RecognizerResult
+
+from plz_bitmap import PlzBitmap
+
+logger = logging.getLogger("presidio-analyzer")
+
+ZIP_RECOGNIZER_NAME = "DeZipCodeRecognizer"
+CITY_SCORE = 0.85
+# Max. characters between PLZ and locality ("10115  Berlin", "10115 - Berlin")
+_CITY_GAP = 3
+
+
+class DeZipCodeRecognizer(PatternRecognizer):
+    """PatternRecognizer that validates matches against the PLZ bitmap."""
+
+    def __init__(self, plz: PlzBitmap, city_score: float = CITY_SCORE, **kwargs):
+        self.plz = plz
+        self.city_score = city_score
+        super().__init__(**kwargs)
+
+    @classmethod
+    def replacing(cls, recognizer: PatternRecognizer, plz: PlzBitmap) -> "DeZipCodeRecognizer":
+        return cls(
+            plz,
+            supported_entity=recognizer.supported_entities[0],
+            name=recognizer.name,
+            supported_language=recognizer.supported_language,
+            patterns=recognizer.patterns,
+            context=recognizer.context,
+            global_regex_flags=recognizer.global_regex_flags,
+        )
+
+    def invalidate_result(self, pattern_text: str) -> Optional[bool]:
+        return not self.plz.is_valid(pattern_text)
+
+    def analyze(self, text, entities, nlp_artifacts=None, regex_flags=None) -> List[RecognizerResult]:
+        results = super().analyze(text, entities, nlp_artifacts, regex_flags)
+        for result in results:
+            cities = self.plz.cities(text[result.start:result.end])
+            if not cities:
+                continue
+            # +1: keep the character after the city for the word-boundary check
+            following = text[result.end:result.end + _CITY_GAP + max(map(len, cities)) + 1]
+            following = following.lstrip(" \t-,").casefold()
+            if any(_starts_with_word(following, city) for city in cities) and result.score < self.city_score:
+                result.score = self.city_score
+                if result.analysis_explanation:
+                    result.analysis_explanation.set_improved_score(self.city_score)
+                    result.analysis_explanation.append_textual_explanation_line("PLZ followed by matching locality")
+        return results
+
+
+def _starts_with_word(following: str, city: str) -> bool:
+    """City at the start of `following`, not followed by a letter ("Berliner Allee")."""
+    return following.startswith(city) and not following[len(city):len(city) + 1].isalpha()
+
+
+def install_zip_code_recognizer(registry, plz: Optional[PlzBitmap] = None) -> bool:
+    """Replace the YAML DeZipCodeRecognizer in `registry`; False if unavailable."""
+    if plz is None:
+        try:
+            plz = PlzBitmap.load()
+        except FileNotFoundError as e:
+            logger.warning(f"PLZ bitmap not available ({e}); DE_ZIP_CODE stays unvalidated")
+            return False
+
+    for i, recognizer in enumerate(registry.recognizers):
+        if recognizer.name == ZIP_RECOGNIZER_NAME and isinstance(recognizer, PatternRecognizer):
+            registry.recognizers[i] = DeZipCodeRecognizer.replacing(recognizer, plz)
+            logger.info(f"DE_ZIP_CODE validated against {len(plz):,} PLZ")
+            return True
+    return False
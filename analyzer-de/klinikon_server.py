@@ -0,0 +1,184 @@
+# /app/klinikon_server.py
+"""
+WSGI entrypoint for the Klinikon analyzer.
+
+Wraps the stock Presidio analyzer app (app.py in the base image) instead of
+forking it: we build Presidio's Server as usual and then replace the /analyze
+view with an instrumented one. Plain JSON requests behave exactly as before;
+see wire_format.py for the optional MessagePack/gzip negotiation.
+
+Extra /analyze request fields:
+- "compact": true -> results contain only entity_type/start/end/score
+  (no recognition_metadata / analysis_explanation)
+- "resolve_overlaps": false -> skip overlap resolution (see overlap_resolution.py);
+  by default results are disjoint spans
+- "time_budget_seconds": lower the recognizer time budget for this request
+  (positive number, capped at ANALYSIS_BUDGET_SECONDS, otherwise 400;
+  see analysis_budget.py)
+
+Responses cut short by the time budget carry "X-Analysis-Partial: true" and
+"X-Analysis-Skipped: <recognizer or recognizer/pattern names>".
+
+DE_ZIP_CODE candidates are validated against the PLZ bitmap built from
+streets.csv (see de_zip_code_recognizer.py). Pattern recognizers run on the
+engine selected by REGEX_ENGINE (see regex_engine.py). With an "entities"
+filter, only the spaCy components those entities need are run; pattern-only
+requests get a tokenizer-only doc (see pipeline_plan.py).
+
+Additional endpoints:
+- /health/live:  process is up (liveness)
+- /health/ready: warm-up finished, 503 until then (readiness); reports
+                 warm-up state, model and gazetteer versions
+
+Started from the Dockerfile via:
+    gunicorn 'klinikon_server:create_app()'
+"""
+
+import logging
+import time
+
+from flask import jsonify, request
+from presidio_analyzer import AnalyzerRequest
+from werkzeug.exceptions import HTTPException
+
+import app as presidio_app
+from tracing import setup_tracing, get_tracer, extract_context, request_start_ns
+from analysis_budget import analysis_budget, install_budget_checks, request_budget
+from de_zip_code_recognizer import install_zip_code_recognizer
+from overlap_resolution import OverlapRules, resolve_overlaps
+from pipeline_plan import PipelinePlanner, describe
+from regex_engine import install_regex_engine
+from warmup import Warmup
+from wire_format import read_body, make_response
+
+logger = logging.getLogger("presidio-analyzer")
+
+setup_tracing("presidio-analyzer")
+tracer = get_tracer("klinikon.analyzer")
+
+COMPACT_FIELDS = ("entity_type", "start", "end", "score")
+
+
+def compact_results(results):
+    return [{field: getattr(r, field) for field in COMPACT_FIELDS} for r in results]
+
+
+def create_app():
+    server = presidio_app.Server()
+    engine = server.engine
+
+    install_zip_code_recognizer(engine.registry)
+    install_regex_engine(engine.registry)
+    install_budget_checks(engine.registry)
+    overlap_rules = OverlapRules.load()
+    planner = PipelinePlanner(engine)
+
+    warmup = Warmup(engine)
+    warmup.start()
+
+    @server.app.route("/health/live")
+    def health_live():
+        return jsonify(status="alive")
+
+    @server.app.route("/health/ready")
+    def health_ready():
+        return jsonify(warmup.report()), 200 if warmup.ready else 503
+
+    def analyze():
+        received_ns = time.time_ns()
+        started = time.monotonic()
+        with tracer.start_as_current_span(
+            "analyzer.request",
+            context=extract_context(request.headers),
+        ) as root:
+            start_ns = request_start_ns(request.headers)
+            if start_ns is not None:
+                # Client send -> handler entry: network transfer + gunicorn backlog
+                tracer.start_span("analyzer.queue", start_time=start_ns).end(end_time=received_ns)
+                root.set_attribute("queue.wait_ms", (received_ns - start_ns) / 1e6)
+
+            try:
+                with tracer.start_as_current_span("analyzer.request.parse") as span:
+                    span.set_attribute("payload.bytes", request.content_length or 0)
+                    req_json = read_body(request) or {}
+                    req_data = AnalyzerRequest(req_json)
+                    budget_seconds = request_budget(req_json.get("time_budget_seconds"))
+                if not req_data.text:
+                    raise Exception("No text provided")
+                if not req_data.language:
+                    raise Exception("No language provided")
+                root.set_attribute("text.length", len(req_data.text))
+                root.set_attribute("entities.requested", len(req_data.entities or []))
+
+                with tracer.start_as_current_span("analyzer.nlp") as span:
+                    plan = planner.plan(
+                        req_data.language,
+                        req_data.entities,
+                        req_data.ad_hoc_recognizers,
+                        req_data.context,
+                    )
+                    span.set_attribute("nlp.pipeline", describe(plan))
+                    nlp_artifacts = planner.process(req_data.text, req_data.language, plan)
+
+                with tracer.start_as_current_span("analyzer.recognizers") as span, \
+                        analysis_budget(budget_seconds, started) as budget:
+                    results = engine.analyze(
+                        text=req_data.text,
+                        language=req_data.language,
+                        correlation_id=req_data.correlation_id,
+                        score_threshold=req_data.score_threshold,
+                        entities=req_data.entities,
+                        return_decision_process=req_data.return_decision_process,
+                        ad_hoc_recognizers=req_data.ad_hoc_recognizers,
+                        context=req_data.context,
+                        allow_list=req_data.allow_list,
+                        allow_list_match=req_data.allow_list_match,
+                        regex_flags=req_data.regex_flags,
+                        nlp_artifacts=nlp_artifacts,
+                    )
+                    span.set_attribute("results.count", len(results))
+                    skipped = list(dict.fromkeys(budget.skipped)) if budget else []
+                    if skipped:
+                        span.set_attribute("budget.skipped", len(skipped))
+                        root.set_attribute("analysis.partial", True)
+                        logger.warning(f"Analysis budget of {budget_seconds}s exhausted, skipped: {skipped}")
+
+                if req_json.get("resolve_overlaps", overlap_rules.enabled):
+                    with tracer.start_as_current_span("analyzer.overlaps") as span:
+                        span.set_attribute("results.before", len(results))
+                        results = resolve_overlaps(req_data.text, results, overlap_rules)
+                        span.set_attribute("results.after", len(results))
+
+                with tracer.start_as_current_span("analyzer.response.serialize") as span:
+                    if req_json.get("compact"):
+                        results = compact_results(results)
+                    response = make_response(
+                        request, results, default=lambda o: o.to_dict(), sort_keys=True
+                    )
+                    span.set_attribute("response.bytes", response.content_length or 0)
+                    span.set_attribute("response.mimetype", response.mimetype)
+                if skipped:
+                    response.headers["X-Analysis-Partial"] = "true"
+                    response.headers["X-Analysis-Skipped"] = ",".join(skipped)
+                return response
+
+            except HTTPException as he:
+                # Undecodable/oversized bodies from wire_format.read_body (400/413)
+                root.set_attribute("error.type", type(he).__name__)
+                logger.error(f"Rejected /analyze request: {he.code} {he.name}")
+                return jsonify(error=he.description), he.code
+            except TypeError as te:
+                root.set_attribute("error.type", type(te).__name__)
+                error_msg = (
+                    f"Failed to parse /analyze request "
+                    f"for AnalyzerEngine.analyze(). {te.args[0]}"
+                )
+                logger.error(error_msg)
+                return jsonify(error=error_msg), 400
+            except Exception as e:
+                root.set_attribute("error.type", type(e).__name__)
+                logger.error(f"A fatal error occurred during execution of AnalyzerEngine.analyze(). {e}")
+                return jsonify(error=e.args[0]), 500
+
+    server.app.view_functions["analyze"] = analyze
+    return server.app
@@ -0,0 +1,186 @@
+# /app/overlap_resolution.py
+"""
+Overlap resolution for analyzer results.
+
+The regex recognizers overlap by design (DE_INSURANCE_NUMBER inside KVNR-like
+strings, DE_ZIP_CODE inside addresses, competing phone patterns). Before
+results leave the analyzer we reduce them to a set of disjoint spans:
+
+1. Same-type overlaps are merged into one span (union, max score).
+2. Remaining spans are ranked by (priority, score, length) and accepted
+   greedily. A span that is fully covered by better-ranked spans is dropped;
+   a partially covered one is trimmed to its uncovered fragments
+   ("partial_overlaps: trim") or dropped ("partial_overlaps: drop").
+
+With "trim" the set of covered characters never shrinks, so nothing that was
+detected is left un-anonymized (apart from fragments shorter than
+min_fragment_length). Span boundaries are coordinate-compressed and each
+elementary segment is claimed at most once, so resolution is O(n log n).
+
+Rules come from OVERLAP_RULES_FILE (see overlap-rules.yml).
+"""
+
+import copy
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, TypeVar
+
+import yaml
+
+logger = logging.getLogger("presidio-analyzer")
+
+OVERLAP_RULES_FILE = os.environ.get("OVERLAP_RULES_FILE", "/app/conf/overlap-rules.yml")
+
+# Characters stripped from the edges of trimmed fragments
+_EDGE_CHARS = " \t\r\n,;:.-/()"
+
+T = TypeVar("T")
+
+
+@dataclass
+class OverlapRules:
+    enabled: bool = True
+    merge_same_type: bool = True
+    partial_overlaps: str = "trim"
+    min_fragment_length: int = 2
+    priorities: Dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: str = OVERLAP_RULES_FILE) -> "OverlapRules":
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = yaml.safe_load(f) or {}
+        except FileNotFoundError:
+            logger.warning(f"Overlap rules not found at {path}; using defaults (no priorities)")
+            return cls()
+        rules = cls(**data)
+        if rules.partial_overlaps not in ("trim", "drop"):
+            raise ValueError(f"partial_overlaps must be 'trim' or 'drop', got {rules.partial_overlaps!r}")
+        return rules
+
+
+def _merge_same_type(results: Sequence[T]) -> List[T]:
+    """Sweep per entity type: overlapping spans of one type collapse into their union."""
+    merged: List[T] = []
+    for r in sorted(results, key=lambda r: (r.entity_type, r.start)):
+        last = merged[-1] if merged else None
+        if last is None or r.entity_type != last.entity_type or r.start >= last.end:
+            merged.append(r)
+            continue
+        if r.end <= last.end and r.score <= last.score:
+            continue                           # contained and not stronger
+        # Keep metadata of the strongest member, extend to the union
+        union = copy.copy(r if r.score > last.score else last)
+        union.start, union.end = last.start, max(last.end, r.end)
+        merged[-1] = union
+    return merged
+
+
+def _strip(text: str, start: int, end: int):
+    while start < end and text[start] in _EDGE_CHARS:
+        start += 1
+    while end > start and text[end - 1] in _EDGE_CHARS:
+        end -= 1
+    return start, end
+
+
+class _ClaimedSegments:
+    """
+    Elementary segments [bounds[i], bounds[i+1]) that can be claimed once.
+
+    A union-find "next unclaimed segment" pointer makes every segment cost
+    O(α(n)) to skip over; with track_counts a Fenwick tree answers "anything
+    claimed in [lo, hi)?" in O(log n).
+    """
+
+    def __init__(self, count: int, track_counts: bool):
+        self._next = list(range(count + 1))       # sentinel at `count`
+        self._tree = [0] * (count + 1) if track_counts else None
+
+    def next_free(self, i: int) -> int:
+        root = i
+        while self._next[root] != root:
+            root = self._next[root]
+        while self._next[i] != root:              # path compression
+            self._next[i], i = root, self._next[i]
+        return root
+
+    def claim(self, i: int) -> None:
+        self._next[i] = i + 1
+        if self._tree is None:
+            return
+        i, size = i + 1, len(self._tree)
+        while i < size:
+            self._tree[i] += 1
+            i += i & -i
+
+    def _prefix(self, i: int) -> int:
+        total = 0
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def any_claimed(self, lo: int, hi: int) -> bool:
+        return self._prefix(hi) - self._prefix(lo) > 0
+
+
+def resolve_overlaps(text: str, results: Sequence[T], rules: OverlapRules) -> List[T]:
+    """
+    Reduce results (objects with entity_type/start/end/score) to disjoint spans.
+
+    Input objects are never modified; trimmed or merged spans are shallow copies.
+    Returns spans sorted by start offset.
+    """
+    if not results:
+        return []
+    candidates = _merge_same_type(results) if rules.merge_same_type else list(results)
+    priorities = rules.priorities
+    candidates.sort(
+        key=lambda r: (priorities.get(r.entity_type, 0), r.score, r.end - r.start, -r.start),
+        reverse=True,
+    )
+
+    # Coordinate compression: all span boundaries, segment i = [bounds[i], bounds[i + 1])
+    bounds = sorted({p for r in candidates for p in (r.start, r.end)})
+    index = {p: i for i, p in enumerate(bounds)}
+    segments = _ClaimedSegments(len(bounds) - 1, track_counts=rules.partial_overlaps == "drop")
+    accepted: List[T] = []
+
+    def accept(r: T, start: int, end: int) -> None:
+        if (start, end) != (r.start, r.end):
+            r = copy.copy(r)
+            r.start, r.end = start, end
+        accepted.append(r)
+
+    for r in candidates:
+        lo, hi = index[r.start], index[r.end]
+        if rules.partial_overlaps == "drop":
+            if not segments.any_claimed(lo, hi):
+                for i in range(lo, hi):
+                    segments.claim(i)
+                accept(r, r.start, r.end)
+            continue
+
+        # Claim every free segment in [lo, hi); consecutive ones form a fragment
+        fragments = []
+        i = segments.next_free(lo)
+        while i < hi:
+            if fragments and fragments[-1][1] == i:
+                fragments[-1][1] = i + 1
+            else:
+                fragments.append([i, i + 1])
+            segments.claim(i)
+            i = segments.next_free(i + 1)
+
+        if fragments == [[lo, hi]]:
+            accept(r, r.start, r.end)          # no overlap at all
+            continue
+        for first, last in fragments:
+            start, end = _strip(text, bounds[first], bounds[last])
+            if end - start >= rules.min_fragment_length:
+                accept(r, start, end)
+
+    accepted.sort(key=lambda r: r.start)
+    return accepted
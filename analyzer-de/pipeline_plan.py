@@ -0,0 +1,129 @@
+# /app/pipeline_plan.py
+"""
+Entity-aware NLP pipeline planning.
+
+Presidio runs the full spaCy pipeline (tok2vec, tagger, morphologizer,
+parser, lemmatizer, entity_ruler, ner, street_gazetteer) for every request,
+even when the caller only asks for regex entities like DE_KVNR or DE_IBAN.
+The recognizer side is already filtered by the requested entities; this
+module does the same for the NLP side:
+
+- PERSON/LOCATION/ORGANIZATION/ADDRESS -> entity_ruler, ner, street_gazetteer
+  (all three together: the ruler presets spans ner must respect, and the
+  gazetteer's ADDRESS spans compete with ner spans in filter_spans)
+- context words on a used recognizer   -> lemmatizer
+- nothing of the above                 -> tokenizer only (nlp.make_doc)
+
+Tagger, morphologizer and parser never feed a recognizer and are skipped.
+
+Shared tok2vec layers and the rule lemmatizer's POS inputs are added
+automatically. Unknown NLP entities or no entity filter run the full pipeline.
+"""
+
+import logging
+from typing import Dict, FrozenSet, Optional, Sequence, Tuple
+
+from presidio_analyzer.nlp_engine import NlpArtifacts
+
+logger = logging.getLogger("presidio-analyzer")
+
+_NER = ("entity_ruler", "ner", "street_gazetteer")
+ENTITY_COMPONENTS: Dict[str, Tuple[str, ...]] = {
+    "PERSON": _NER,
+    "LOCATION": _NER,
+    "ORGANIZATION": _NER,
+    "ADDRESS": _NER,
+}
+LEMMA_COMPONENTS = ("lemmatizer",)
+# Inputs of spaCy's rule-based lemmatizer (POS/morphology)
+_RULE_LEMMATIZER_INPUTS = ("tagger", "morphologizer", "attribute_ruler")
+
+FULL = None                                   # plan: run every component
+Plan = Optional[Tuple[str, ...]]
+
+
+class PipelinePlanner:
+    """Chooses and runs the smallest spaCy pipeline that serves a request."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.nlp_engine = engine.nlp_engine
+        self._plans: Dict[Tuple[str, FrozenSet[str], bool], Plan] = {}
+
+    def _dependencies(self, nlp, needed: set) -> set:
+        required = needed & set(nlp.pipe_names)
+        if "lemmatizer" in required and getattr(nlp.get_pipe("lemmatizer"), "mode", None) == "rule":
+            required |= set(_RULE_LEMMATIZER_INPUTS) & set(nlp.pipe_names)
+        # Components that listen to a shared embedding layer need that layer
+        for name, component in nlp.pipeline:
+            listeners = getattr(component, "listening_components", None)
+            if listeners and required & set(listeners):
+                required.add(name)
+        return required
+
+    def plan(
+        self,
+        language: str,
+        entities: Optional[Sequence[str]],
+        ad_hoc_recognizers=None,
+        context=None,
+    ) -> Plan:
+        """Enabled components (pipeline order), () for tokenizer only, FULL for everything."""
+        if not entities:
+            return FULL
+        # Only NLP entities and the lemma flag shape the plan; keying on them
+        # keeps the cache bounded whatever entity lists clients send
+        nlp_entities = set(self.nlp_engine.get_supported_entities())
+        requested = frozenset(entity for entity in entities if entity in nlp_entities)
+        needs_lemmas = self.needs_lemmas(language, entities, ad_hoc_recognizers, context)
+        key = (language, requested, needs_lemmas)
+        if key in self._plans:
+            return self._plans[key]
+
+        nlp = self.nlp_engine.get_nlp(language)
+        needed = set(LEMMA_COMPONENTS) if needs_lemmas else set()
+        plan: Plan = FULL
+        for entity in requested:
+            if entity not in ENTITY_COMPONENTS:
+                break                                 # unknown NLP entity: keep everything
+            needed.update(ENTITY_COMPONENTS[entity])
+        else:
+            required = self._dependencies(nlp, needed)
+            plan = tuple(name for name in nlp.pipe_names if name in required)
+            if len(plan) == len(nlp.pipe_names):
+                plan = FULL
+
+        self._plans[key] = plan
+        logger.info(f"NLP plan for {sorted(requested) or 'pattern entities'}"
+                    f"{' + lemmas' if needs_lemmas else ''}: {describe(plan)}")
+        return plan
+
+    def needs_lemmas(self, language: str, entities, ad_hoc_recognizers=None, context=None) -> bool:
+        """Lemmas only matter for context enhancement of the recognizers in use."""
+        if context:
+            return True
+        try:
+            recognizers = self.engine.registry.get_recognizers(
+                language=language,
+                entities=entities,
+                all_fields=not entities,
+                ad_hoc_recognizers=ad_hoc_recognizers,
+            )
+        except ValueError:
+            return False                              # no recognizer: engine.analyze reports it
+        return any(getattr(r, "context", None) for r in recognizers)
+
+    def process(self, text: str, language: str, plan: Plan) -> NlpArtifacts:
+        if plan is FULL:
+            return self.nlp_engine.process_text(text, language)
+        nlp = self.nlp_engine.get_nlp(language)
+        if not plan:
+            doc = nlp.make_doc(text)
+        else:
+            doc = nlp(text, disable=[name for name in nlp.pipe_names if name not in plan])
+        return self.nlp_engine._doc_to_nlp_artifact(doc, language)
+
+
+def describe(plan: Plan) -> str:
+    """Short form for logs and span attributes."""
+    return "full" if plan is FULL else ",".join(plan) or "tokenizer"
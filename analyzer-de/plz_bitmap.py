@@ -0,0 +1,74 @@
+# /app/plz_bitmap.py
+"""
+Compact German postal code (PLZ) lookup.
+
+All 100,000 possible five-digit codes map to one bit each (12,500 bytes), so
+"is this a real PLZ?" is a single byte index and shift. An optional table maps
+valid codes to their localities for "10115 Berlin"-style confirmation.
+
+Both files are generated from streets.csv at image build time by
+build_plz_bitmap.py:
+- plz.bitmap:     raw bitmap, bit n set <=> PLZ n exists (LSB-first per byte)
+- plz-cities.tsv: "<plz>\t<locality>|<locality>..." per valid code
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+PLZ_COUNT = 100_000
+BITMAP_BYTES = PLZ_COUNT // 8
+
+PLZ_BITMAP_PATH = Path(os.environ.get("PLZ_BITMAP_PATH", "/app/data/plz.bitmap"))
+PLZ_CITIES_PATH = Path(os.environ.get("PLZ_CITIES_PATH", "/app/data/plz-cities.tsv"))
+
+
+class PlzBitmap:
+    """Validity bitmap over 00000-99999 plus optional PLZ -> localities table."""
+
+    def __init__(self, bits: bytes, cities: Optional[Dict[int, Tuple[str, ...]]] = None):
+        if len(bits) != BITMAP_BYTES:
+            raise ValueError(f"PLZ bitmap must be {BITMAP_BYTES} bytes, got {len(bits)}")
+        self._bits = bits
+        self._cities = cities or {}
+
+    @classmethod
+    def from_codes(cls, codes: Iterable[int], cities=None) -> "PlzBitmap":
+        bits = bytearray(BITMAP_BYTES)
+        for code in codes:
+            bits[code >> 3] |= 1 << (code & 7)
+        return cls(bytes(bits), cities)
+
+    @classmethod
+    def load(cls, bitmap_path: Path = PLZ_BITMAP_PATH, cities_path: Path = PLZ_CITIES_PATH) -> "PlzBitmap":
+        cities: Dict[int, Tuple[str, ...]] = {}
+        if cities_path.is_file():
+            with cities_path.open(encoding="utf-8") as f:
+                for line in f:
+                    code, _, names = line.rstrip("\n").partition("\t")
+                    # Stored casefolded, compared against casefolded text
+                    cities[int(code)] = tuple(name for name in names.split("|") if name)
+        return cls(bitmap_path.read_bytes(), cities)
+
+    def is_valid(self, plz: str) -> bool:
+        """O(1) validity check for a five-digit string."""
+        if len(plz) != 5 or not plz.isdigit():
+            return False
+        code = int(plz)
+        return bool(self._bits[code >> 3] >> (code & 7) & 1)
+
+    def cities(self, plz: str) -> Tuple[str, ...]:
+        """Casefolded localities for a valid code (empty without the table)."""
+        return self._cities.get(int(plz), ())
+
+    def __len__(self) -> int:
+        return sum(bin(b).count("1") for b in self._bits)
+
+    def write(self, bitmap_path: Path, cities_path: Optional[Path] = None) -> None:
+        bitmap_path.write_bytes(self._bits)
+        if cities_path is not None:
+            with cities_path.open("w", encoding="utf-8") as f:
+                for code in sorted(self._cities):
+                    if not self._cities[code]:
+                        continue
+                    f.write(f"{code:05d}\t{'|'.join(self._cities[code])}\n")
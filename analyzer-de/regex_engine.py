@@ -0,0 +1,106 @@
+# /app/regex_engine.py
+"""
+Regex execution for the pattern recognizers.
+
+Presidio compiles patterns lazily with the backtracking `regex` module and
+caches them on the Pattern (compiled_regex / compiled_with_flags). We
+precompile every pattern at startup into a wrapper that
+- with REGEX_ENGINE=re2 runs on RE2 (google-re2): guaranteed linear time,
+  no catastrophic backtracking on long runs of dots, digits or base64;
+- falls back to `regex` for constructs RE2 does not support (lookaround,
+  backreferences, flags other than IGNORECASE/MULTILINE/DOTALL);
+- caps the `regex` timeout at the remaining request budget
+  (see analysis_budget.py) and records patterns that ran out of time.
+
+Note: RE2's \\b, \\d and \\w are ASCII-only, which matches how our German
+recognizers use them (digits and ASCII letters at the boundaries).
+
+REGEX_ENGINE: "regex" (default, Presidio behaviour + budget) or "re2".
+"""
+
+import logging
+import os
+from typing import Dict, Iterator, Optional
+
+import regex
+
+from analysis_budget import current_budget
+
+logger = logging.getLogger("presidio-analyzer")
+
+REGEX_ENGINE = os.environ.get("REGEX_ENGINE", "regex").lower()
+
+_RE2_FLAGS = {regex.IGNORECASE: "i", regex.MULTILINE: "m", regex.DOTALL: "s"}
+
+
+class BudgetedPattern:
+    """Stands in for a compiled pattern; Presidio only calls finditer(text, timeout=...)."""
+
+    def __init__(self, compiled, name: str, linear: bool):
+        self._compiled = compiled
+        self.name = name
+        self.linear = linear
+        self.pattern = compiled.pattern
+
+    def finditer(self, text: str, timeout: Optional[float] = None) -> Iterator:
+        budget = current_budget()
+        if budget is not None:
+            remaining = budget.remaining()
+            if remaining <= 0:
+                budget.skipped.append(self.name)
+                raise TimeoutError(f"Analysis budget exhausted before pattern {self.name}")
+            timeout = remaining if timeout is None else min(timeout, remaining)
+
+        if self.linear:
+            return self._compiled.finditer(text)
+        return self._guard(self._compiled.finditer(text, timeout=timeout), budget)
+
+    def _guard(self, matches: Iterator, budget) -> Iterator:
+        try:
+            yield from matches
+        except TimeoutError:
+            if budget is not None:
+                budget.skipped.append(self.name)
+            raise
+
+
+def _compile_re2(pattern: str, flags: int):
+    import re2
+
+    if flags & ~sum(_RE2_FLAGS):
+        raise ValueError(f"unsupported flags {flags:#x}")
+    inline = "".join(letter for flag, letter in _RE2_FLAGS.items() if flags & flag)
+    options = re2.Options()
+    options.log_errors = False
+    options.never_capture = True                # only spans are used
+    return re2.compile(f"(?{inline}){pattern}" if inline else pattern, options)
+
+
+def install_regex_engine(registry, engine: str = REGEX_ENGINE) -> Dict[str, int]:
+    """Precompile all PatternRecognizer patterns; returns {"re2": n, "regex": m}."""
+    if engine == "re2":
+        try:
+            import re2  # noqa: F401
+        except ImportError:
+            logger.warning("REGEX_ENGINE=re2 but google-re2 is not installed; using regex")
+            engine = "regex"
+
+    counts = {"re2": 0, "regex": 0}
+    for recognizer in registry.recognizers:
+        flags = getattr(recognizer, "global_regex_flags", None)
+        for pattern in getattr(recognizer, "patterns", None) or []:
+            name = f"{recognizer.name}/{pattern.name}"
+            compiled, linear = None, False
+            if engine == "re2":
+                try:
+                    compiled, linear = _compile_re2(pattern.regex, flags or 0), True
+                except Exception as e:
+                    logger.info(f"Pattern {name} not supported by RE2 ({e}); falling back to regex")
+            if compiled is None:
+                compiled = regex.compile(pattern.regex, flags=flags or 0)
+            pattern.compiled_regex = BudgetedPattern(compiled, name, linear)
+            pattern.compiled_with_flags = flags
+            counts["re2" if linear else "regex"] += 1
+
+    logger.info(f"Regex engine: {counts['re2']} patterns on RE2, {counts['regex']} on regex")
+    return counts
@@ -1,5 +1,6 @@
 # /app/street_gazetteer.py
 import csv
+import hashlib
 import unicodedata
 import re
 from pathlib import Path
@@ -81,11 +82,28 @@ def load_street_names(path: Path) -> set[str]:
     return names
 
 
+def file_fingerprint(path: Path) -> str:
+    """
+    Short content hash of the source CSV, reported as gazetteer version.
+    """
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
 # Load dictionary at import time (once per process)
 print(f"[street_gazetteer] Loading streets from {STREETS_CSV_PATH} ...")
 STREET_NAMES = load_street_names(STREETS_CSV_PATH)
 print(f"[street_gazetteer] Loaded {len(STREET_NAMES):,} street names.")
 
+GAZETTEER_INFO = {
+    "source": STREETS_CSV_PATH.name,
+    "version": file_fingerprint(STREETS_CSV_PATH),
+    "streets": len(STREET_NAMES),
+}
+
 
 @Language.component("street_gazetteer")
 def street_gazetteer(doc):
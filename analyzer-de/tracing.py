@@ -0,0 +1,121 @@
+# /app/tracing.py
+"""
+OpenTelemetry setup for the Klinikon service wrappers.
+
+Incoming requests carry a W3C traceparent header (set by the UI helpers) and
+an X-Request-Start header with the client send time, so the server side can
+continue the UI trace and report how long a request waited before a worker
+picked it up.
+
+Configuration (environment):
+- TRACING_EXPORTER: "none" (default), "file" or "otlp"
+- TRACING_FILE: JSON-lines output for "file"
+- OTEL_EXPORTER_OTLP_ENDPOINT: collector for "otlp" (e.g. http://jaeger:4318)
+
+Span attributes must never contain PHI: only lengths, counts and timings.
+Exceptions are therefore not recorded on spans (messages and stack traces
+can quote the input); failing spans only get the "error.type" attribute.
+"""
+
+import os
+import time
+import logging
+from contextlib import contextmanager
+from typing import Iterator, Mapping, Optional
+
+from opentelemetry import trace, propagate
+from opentelemetry.context import Context
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+logger = logging.getLogger("klinikon-tracing")
+
+TRACING_EXPORTER = os.environ.get("TRACING_EXPORTER", "none").lower()
+REQUEST_START_HEADER = "X-Request-Start"
+
+_configured = False
+
+
+def setup_tracing(service_name: str) -> None:
+    """Install the global TracerProvider once per process."""
+    global _configured
+    if _configured:
+        return
+    _configured = True
+
+    if TRACING_EXPORTER == "none":
+        return
+
+    if TRACING_EXPORTER == "file":
+        path = os.environ.get("TRACING_FILE", f"/app/traces/{service_name}.jsonl")
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        exporter = ConsoleSpanExporter(
+            out=open(path, "a", encoding="utf-8"),
+            formatter=lambda span: span.to_json(indent=None) + "\n",
+        )
+    elif TRACING_EXPORTER == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        exporter = OTLPSpanExporter()
+    else:
+        logger.warning("Unknown TRACING_EXPORTER %r, tracing disabled", TRACING_EXPORTER)
+        return
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": os.environ.get("OTEL_SERVICE_NAME", service_name)})
+    )
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    logger.info("Tracing enabled (exporter: %s)", TRACING_EXPORTER)
+
+
+class _PhiSafeTracer:
+    """Tracer whose spans never record exception messages or stack traces."""
+
+    def __init__(self, tracer: trace.Tracer):
+        self._tracer = tracer
+
+    def __getattr__(self, name):
+        return getattr(self._tracer, name)
+
+    @contextmanager
+    def start_as_current_span(self, name: str, **kwargs) -> Iterator[trace.Span]:
+        kwargs["record_exception"] = False
+        kwargs["set_status_on_exception"] = False
+        with self._tracer.start_as_current_span(name, **kwargs) as span:
+            try:
+                yield span
+            except Exception as e:
+                span.set_attribute("error.type", type(e).__name__)
+                span.set_status(trace.StatusCode.ERROR)
+                raise
+
+
+def get_tracer(name: str) -> _PhiSafeTracer:
+    return _PhiSafeTracer(trace.get_tracer(name))
+
+
+def extract_context(headers: Mapping[str, str]) -> Context:
+    """Continue the caller's trace (no-op context if no traceparent was sent)."""
+    return propagate.extract(headers)
+
+
+def request_start_ns(headers: Mapping[str, str]) -> Optional[int]:
+    """
+    Parse X-Request-Start ("t=<microseconds since epoch>") into nanoseconds.
+
+    Returns None for missing/garbled headers or timestamps in the future
+    (clock skew), so callers simply skip the queue span.
+    """
+    raw = headers.get(REQUEST_START_HEADER)
+    if not raw:
+        return None
+    try:
+        start_ns = int(raw.split("=", 1)[-1]) * 1000
+    except ValueError:
+        return None
+    if start_ns > time.time_ns():
+        return None
+    return start_ns
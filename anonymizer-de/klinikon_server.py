@@ -0,0 +1,123 @@
+# /app/klinikon_server.py
+"""
+WSGI entrypoint for the Klinikon anonymizer.
+
+Wraps the stock Presidio anonymizer app (app.py in the base image): we build
+Presidio's Server as usual and replace the /anonymize view with an
+instrumented one. Plain JSON requests behave exactly as before; see
+wire_format.py for the optional MessagePack/gzip negotiation.
+
+Started from the Dockerfile via:
+    gunicorn 'klinikon_server:create_app()'
+"""
+
+import contextvars
+import time
+from collections import defaultdict
+
+from flask import Response, request
+from werkzeug.exceptions import BadRequest
+from presidio_anonymizer.services.app_entities_convertor import AppEntitiesConvertor
+
+import app as presidio_app
+from tracing import setup_tracing, get_tracer, extract_context, request_start_ns
+from wire_format import read_body, make_response
+
+setup_tracing("presidio-anonymizer")
+tracer = get_tracer("klinikon.anonymizer")
+
+# Per-request operator stats: {operator_name: [calls, seconds]}
+_operator_stats = contextvars.ContextVar("operator_stats", default=None)
+
+
+class _TimedOperator:
+    """Proxy that accumulates operate() time per operator into _operator_stats."""
+
+    def __init__(self, operator, name: str):
+        self._operator = operator
+        self._name = name
+
+    def __getattr__(self, item):
+        return getattr(self._operator, item)
+
+    def operate(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._operator.operate(*args, **kwargs)
+        finally:
+            stats = _operator_stats.get()
+            if stats is not None:
+                entry = stats[self._name]
+                entry[0] += 1
+                entry[1] += time.perf_counter() - started
+
+
+def _instrument_operators(engine) -> None:
+    factory = engine.operators_factory
+    create_operator_class = factory.create_operator_class
+
+    def timed_create_operator_class(operator_name, operator_type):
+        return _TimedOperator(create_operator_class(operator_name, operator_type), operator_name)
+
+    factory.create_operator_class = timed_create_operator_class
+
+
+def create_app():
+    server = presidio_app.Server()
+    engine = server.anonymizer
+    _instrument_operators(engine)
+
+    def anonymize() -> Response:
+        received_ns = time.time_ns()
+        with tracer.start_as_current_span(
+            "anonymizer.request",
+            context=extract_context(request.headers),
+        ) as root:
+            start_ns = request_start_ns(request.headers)
+            if start_ns is not None:
+                # Client send -> handler entry: network transfer + gunicorn backlog
+                tracer.start_span("anonymizer.queue", start_time=start_ns).end(end_time=received_ns)
+                root.set_attribute("queue.wait_ms", (received_ns - start_ns) / 1e6)
+
+            with tracer.start_as_current_span("anonymizer.request.parse") as span:
+                span.set_attribute("payload.bytes", request.content_length or 0)
+                content = read_body(request)
+                if not content:
+                    raise BadRequest("Invalid request json")
+
+                anonymizers_config = AppEntitiesConvertor.operators_config_from_json(
+                    content.get("anonymizers")
+                )
+                if AppEntitiesConvertor.check_custom_operator(anonymizers_config):
+                    raise BadRequest("Custom type anonymizer is not supported")
+
+                analyzer_results = AppEntitiesConvertor.analyzer_results_from_json(
+                    content.get("analyzer_results")
+                )
+            text = content.get("text", "")
+            root.set_attribute("text.length", len(text))
+            root.set_attribute("results.count", len(analyzer_results))
+
+            with tracer.start_as_current_span("anonymizer.operators") as span:
+                stats = defaultdict(lambda: [0, 0.0])
+                token = _operator_stats.set(stats)
+                try:
+                    anonymizer_result = engine.anonymize(
+                        text=text,
+                        analyzer_results=analyzer_results,
+                        operators=anonymizers_config,
+                    )
+                finally:
+                    _operator_stats.reset(token)
+                for name, (calls, seconds) in stats.items():
+                    span.set_attribute(f"operator.{name}.count", calls)
+                    span.set_attribute(f"operator.{name}.ms", seconds * 1000)
+
+            with tracer.start_as_current_span("anonymizer.response.serialize") as span:
+                response = make_response(request, anonymizer_result, default=lambda o: o.__dict__)
+                span.set_attribute("response.bytes", response.content_length or 0)
+                span.set_attribute("response.mimetype", response.mimetype)
+            return response
+
+    server.app.view_functions["anonymize"] = anonymize
+    return server.app
@@ -0,0 +1,82 @@
+# /app/wire_format.py
+"""
+Negotiated wire format for the Klinikon service wrappers.
+
+Requests:
+- Content-Type: application/msgpack  -> body is MessagePack instead of JSON
+- Content-Encoding: gzip             -> body is gzip-compressed
+Responses:
+- Accept: application/msgpack        -> MessagePack body
+- Accept-Encoding: gzip              -> gzip body, only if WIRE_COMPRESS_MIN_BYTES > 0
+                                        and the body is at least that large
+
+Clients that send neither (stock Presidio clients, curl) get plain JSON as before.
+Response compression is off by default: `requests` always sends
+"Accept-Encoding: gzip", and on the local bridge network gzip would only cost
+CPU on the analyzer worker.
+"""
+
+import gzip
+import json
+import os
+import zlib
+from typing import Any, Callable, Optional
+
+import msgpack
+from flask import Request, Response
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+
+# 0 = never compress responses
+COMPRESS_MIN_BYTES = int(os.environ.get("WIRE_COMPRESS_MIN_BYTES", "0"))
+GZIP_LEVEL = int(os.environ.get("WIRE_GZIP_LEVEL", "1"))
+# Guard against decompression bombs
+MAX_BODY_BYTES = int(os.environ.get("WIRE_MAX_BODY_BYTES", str(64 * 1024 * 1024)))
+
+
+def _gunzip(data: bytes) -> bytes:
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    out = decompressor.decompress(data, MAX_BODY_BYTES + 1)
+    if len(out) > MAX_BODY_BYTES or decompressor.unconsumed_tail:
+        raise RequestEntityTooLarge("Decompressed request body too large")
+    return out
+
+
+def read_body(request: Request) -> Any:
+    """Decode the request body according to Content-Encoding / Content-Type."""
+    data = request.get_data()
+    if request.headers.get("Content-Encoding", "").lower() == "gzip":
+        try:
+            data = _gunzip(data)
+        except zlib.error:
+            raise BadRequest("Invalid gzip request body")
+    if not data:
+        return None
+    try:
+        if request.mimetype == MSGPACK:
+            return msgpack.unpackb(data)
+        return json.loads(data)
+    except ValueError:
+        raise BadRequest("Invalid request body")
+
+
+def make_response(
+    request: Request,
+    obj: Any,
+    default: Optional[Callable[[Any], Any]] = None,
+    sort_keys: bool = False,
+) -> Response:
+    """Encode obj as JSON or MessagePack (per Accept) and gzip it if worthwhile."""
+    if request.accept_mimetypes.best_match([JSON, MSGPACK]) == MSGPACK:
+        body, mimetype = msgpack.packb(obj, default=default), MSGPACK
+    else:
+        body, mimetype = json.dumps(obj, default=default, sort_keys=sort_keys).encode("utf-8"), JSON
+
+    response = Response(body, mimetype=mimetype)
+    response.vary.update(("Accept", "Accept-Encoding"))
+    if 0 < COMPRESS_MIN_BYTES <= len(body) and "gzip" in request.accept_encodings:
+        response.set_data(gzip.compress(body, compresslevel=GZIP_LEVEL))
+        response.headers["Content-Encoding"] = "gzip"
+    return response
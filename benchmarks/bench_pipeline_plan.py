@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark Pipeline-Planung: volle spaCy-Pipeline vs. nach angefragten
+Entitäten geplante Pipeline (pipeline_plan.py)
+
+Für mehrere Entitäten-Filter wird derselbe Text einmal wie bisher
+(process_text + analyze, alle Komponenten) und einmal mit PipelinePlanner
+analysiert. Ausgegeben werden die laufenden Komponenten, Zeit pro Dokument
+und ob beide Wege identische Treffer liefern.
+
+Benötigt das Analyzer-Modell mit street_gazetteer, läuft daher am
+einfachsten im Analyzer-Container:
+    docker compose cp benchmarks/bench_pipeline_plan.py presidio-analyzer:/app/
+    docker compose exec presidio-analyzer python /app/bench_pipeline_plan.py --repeat 5
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import yaml
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+ANALYZER_DIR = ROOT_DIR / "analyzer-de"
+CONF_DIR = ANALYZER_DIR if ANALYZER_DIR.is_dir() else Path("/app/conf")
+SAMPLE_TEXT_PATH = ROOT_DIR / "tests" / "sample-data" / "beispiel-text.txt"
+sys.path.insert(0, str(ANALYZER_DIR))
+
+from presidio_analyzer import AnalyzerEngine  # noqa: E402
+from presidio_analyzer.nlp_engine import NlpEngineProvider  # noqa: E402
+from presidio_analyzer.recognizer_registry import RecognizerRegistryProvider  # noqa: E402
+
+import street_gazetteer  # noqa: E402,F401  (registriert die spaCy-Komponente)
+from pipeline_plan import PipelinePlanner, describe  # noqa: E402
+
+ENTITY_SETS = {
+    "alle": None,
+    "KVNR+IBAN+E-Mail": ["DE_KVNR", "DE_IBAN", "EMAIL_ADDRESS"],
+    "Telefon+PLZ": ["DE_PHONE_NUMBER", "DE_ZIP_CODE"],
+    "Personen": ["PERSON"],
+    "Adressen": ["ADDRESS"],
+    "Personen+IBAN": ["PERSON", "DE_IBAN"],
+}
+
+FALLBACK_TEXT = (
+    "Patient: Max Mustermann, geb. 12.03.1965, KVNR A123456789\n"
+    "Anschrift: Hauptstraße 12, 10115 Berlin, Tel. 030 12345678\n"
+    "IBAN DE89 3704 0044 0532 0130 00, E-Mail max.mustermann@example.de\n"
+)
+
+
+def build_engine(model: Optional[str]) -> AnalyzerEngine:
+    nlp_conf = yaml.safe_load((CONF_DIR / "nlp-config-de.yml").read_text(encoding="utf-8"))
+    if model:
+        nlp_conf["models"][0]["model_name"] = model
+    nlp_engine = NlpEngineProvider(nlp_configuration=nlp_conf).create_engine()
+    registry = RecognizerRegistryProvider(
+        conf_file=CONF_DIR / "recognizers-de.yml", nlp_engine=nlp_engine,
+    ).create_recognizer_registry()
+    return AnalyzerEngine(registry=registry, nlp_engine=nlp_engine, supported_languages=["de"])
+
+
+def spans(results) -> List[tuple]:
+    return sorted((r.entity_type, r.start, r.end, round(r.score, 4)) for r in results)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", help="Modellpfad (Standard: aus nlp-config-de.yml)")
+    parser.add_argument("--copies", type=int, default=5, help="Beispieltext n-mal aneinanderhängen")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    engine = build_engine(args.model)
+    planner = PipelinePlanner(engine)
+    sample = SAMPLE_TEXT_PATH.read_text(encoding="utf-8") if SAMPLE_TEXT_PATH.exists() else FALLBACK_TEXT
+    text = "\n\n".join([sample] * args.copies)
+
+    def stock(entities):
+        artifacts = engine.nlp_engine.process_text(text, "de")
+        return engine.analyze(text=text, language="de", entities=entities, nlp_artifacts=artifacts)
+
+    def planned(entities):
+        plan = planner.plan("de", entities)
+        artifacts = planner.process(text, "de", plan)
+        return engine.analyze(text=text, language="de", entities=entities, nlp_artifacts=artifacts)
+
+    def best_ms(fn, entities) -> float:
+        best = float("inf")
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            fn(entities)
+            best = min(best, time.perf_counter() - started)
+        return best * 1000
+
+    print(f"Dokument: {len(text):,} Zeichen, Pipeline: {', '.join(engine.nlp_engine.get_nlp('de').pipe_names)}\n")
+    header = f"{'Filter':<18} {'voll ms':>9} {'geplant ms':>11} {'Faktor':>7}  {'identisch':<9}  Komponenten"
+    print(header)
+    print("-" * len(header))
+    for name, entities in ENTITY_SETS.items():
+        stock(entities)                                   # Warm-up
+        plan = planner.plan("de", entities)
+        same = spans(stock(entities)) == spans(planned(entities))
+        t_stock, t_planned = best_ms(stock, entities), best_ms(planned, entities)
+        print(f"{name:<18} {t_stock:>9.1f} {t_planned:>11.1f} {t_stock / t_planned:>6.1f}x  "
+              f"{'ja' if same else 'NEIN':<9}  {describe(plan)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Benchmark PLZ-Bitmap: Wie viele DE_ZIP_CODE-Kandidaten fallen in laborlastigen
+Befunden weg, und wie viel Zeit spart das pro Dokument?
+
+Verglichen werden der bisherige YAML-Recognizer (jede fünfstellige Zahl) und
+DeZipCodeRecognizer mit PLZ-Bitmap. Gemessen wird pro Dokument:
+Recognizer + Überlappungsauflösung + JSON-Serialisierung der Treffer (der
+Teil der Pipeline, den jeder Kandidat durchläuft). Dazu ein Vergleich
+Bitmap vs. Python-set für Nachschlagen und Speicher.
+
+Die Dokumente sind synthetische Laborbefunde (Auftrags-/Fallnummern,
+Laborwerte, Dosierungen) mit einzelnen echten Anschriften.
+
+Benötigt presidio-analyzer und die Bitmap aus build_plz_bitmap.py:
+    python benchmarks/bench_plz_bitmap.py --streets analyzer-de/data/streets.csv
+    python benchmarks/bench_plz_bitmap.py --bitmap plz.bitmap --cities plz-cities.tsv
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ANALYZER_DIR = Path(__file__).resolve().parent.parent / "analyzer-de"
+sys.path.insert(0, str(ANALYZER_DIR))
+
+from presidio_analyzer import Pattern, PatternRecognizer  # noqa: E402
+
+import build_plz_bitmap  # noqa: E402
+from de_zip_code_recognizer import DeZipCodeRecognizer  # noqa: E402
+from overlap_resolution import OverlapRules, resolve_overlaps  # noqa: E402
+from plz_bitmap import PlzBitmap  # noqa: E402
+
+# Wie in recognizers-de.yml
+ZIP_PATTERN = Pattern("de_zip", r"\b\d{5}\b", 0.50)
+GLOBAL_REGEX_FLAGS = 26
+
+LAB_LINES = [
+    "Auftragsnummer {n5}, Fallnummer {n5}, Eingang {d}",
+    "Leukozyten {n5} /µl (Ref. 4000-10000)",
+    "Thrombozyten {n3} G/l, Erythrozyten 4,{n1} T/l",
+    "CK {n5} U/l, LDH {n3} U/l, Troponin T {n2} ng/l",
+    "Heparin {n5} IE/24h über Perfusor, Probe {n5}",
+    "Ferritin {n3} µg/l, Vitamin B12 {n3} pg/ml",
+    "Bakteriologie Einsendung {n5}, Material {n5}, Keimzahl {n5} KBE/ml",
+]
+ADDRESS_LINE = "Einsender: Praxis Dr. Beispiel, Hauptstraße {n2}, {plz} {city}"
+
+
+def build_report(rng: random.Random, lines: int, addresses: List[tuple]) -> str:
+    out = []
+    for i in range(lines):
+        template = rng.choice(LAB_LINES)
+        if i % 25 == 0 and addresses:
+            plz, city = rng.choice(addresses)
+            template = ADDRESS_LINE.replace("{plz}", plz).replace("{city}", city.title())
+        out.append(template.format(
+            n5=rng.randint(10000, 99999), n3=rng.randint(100, 999),
+            n2=rng.randint(10, 99), n1=rng.randint(0, 9), d="03.02.2024",
+        ))
+    return "\n".join(out)
+
+
+def run_pipeline(recognizer, text: str, rules: OverlapRules) -> int:
+    results = recognizer.analyze(text, ["DE_ZIP_CODE"])
+    results = resolve_overlaps(text, results, rules)
+    json.dumps(results, default=lambda o: o.to_dict())
+    return len(results)
+
+
+def time_per_doc(recognizer, docs: List[str], rules: OverlapRules, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for doc in docs:
+            run_pipeline(recognizer, doc, rules)
+        best = min(best, time.perf_counter() - started)
+    return best / len(docs)
+
+
+def lookup_comparison(plz: PlzBitmap, rng: random.Random) -> Dict[str, Any]:
+    codes = {code for code in range(100_000) if plz.is_valid(f"{code:05d}")}
+    probes = [f"{rng.randint(0, 99999):05d}" for _ in range(200_000)]
+
+    started = time.perf_counter()
+    for p in probes:
+        plz.is_valid(p)
+    bitmap_ns = (time.perf_counter() - started) / len(probes) * 1e9
+
+    started = time.perf_counter()
+    for p in probes:
+        int(p) in codes
+    set_ns = (time.perf_counter() - started) / len(probes) * 1e9
+
+    set_bytes = sys.getsizeof(codes) + sum(sys.getsizeof(c) for c in codes)
+    return {"codes": len(codes), "bitmap_bytes": 12_500, "set_bytes": set_bytes,
+            "bitmap_ns": bitmap_ns, "set_ns": set_ns}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--streets", help="streets.csv (Bitmap wird temporär gebaut)")
+    parser.add_argument("--bitmap", default=str(ANALYZER_DIR / "data" / "plz.bitmap"))
+    parser.add_argument("--cities", default=str(ANALYZER_DIR / "data" / "plz-cities.tsv"))
+    parser.add_argument("--docs", type=int, default=50)
+    parser.add_argument("--lines", type=int, default=200, help="Zeilen pro Befund")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    if args.streets:
+        tmp = Path(tempfile.mkdtemp())
+        args.bitmap, args.cities = str(tmp / "plz.bitmap"), str(tmp / "plz-cities.tsv")
+        build_plz_bitmap.main([args.streets, args.bitmap, args.cities])
+    plz = PlzBitmap.load(Path(args.bitmap), Path(args.cities))
+
+    rng = random.Random(args.seed)
+    addresses = []
+    for code in range(100_000):
+        cities = plz.cities(f"{code:05d}")
+        if cities:
+            addresses.append((f"{code:05d}", cities[0]))
+    docs = [build_report(rng, args.lines, rng.sample(addresses, min(20, len(addresses)))) for _ in range(args.docs)]
+
+    kwargs = dict(
+        supported_entity="DE_ZIP_CODE", name="DeZipCodeRecognizer", supported_language="de",
+        patterns=[ZIP_PATTERN], global_regex_flags=GLOBAL_REGEX_FLAGS,
+    )
+    stock = PatternRecognizer(**kwargs)
+    validated = DeZipCodeRecognizer(plz, **kwargs)
+    rules = OverlapRules.load(ANALYZER_DIR / "overlap-rules.yml")
+
+    before = sum(len(stock.analyze(d, ["DE_ZIP_CODE"])) for d in docs)
+    after_results = [r for d in docs for r in validated.analyze(d, ["DE_ZIP_CODE"])]
+    boosted = sum(1 for r in after_results if r.score >= validated.city_score)
+    stock_ms = time_per_doc(stock, docs, rules, args.repeat) * 1000
+    validated_ms = time_per_doc(validated, docs, rules, args.repeat) * 1000
+
+    chars = sum(len(d) for d in docs) / len(docs)
+    print(f"Dokumente: {len(docs)} laborlastige Befunde, ~{chars:,.0f} Zeichen")
+    print(f"DE_ZIP_CODE-Kandidaten pro Dokument: {before / len(docs):.1f} -> {len(after_results) / len(docs):.1f} "
+          f"({1 - len(after_results) / max(before, 1):.0%} eliminiert, {boosted / len(docs):.1f} mit Ort bestätigt)")
+    print(f"Zeit pro Dokument (Recognizer + Überlappung + JSON): {stock_ms:.2f} ms -> {validated_ms:.2f} ms "
+          f"({stock_ms - validated_ms:.2f} ms gespart)")
+
+    lookup = lookup_comparison(plz, rng)
+    print(f"Nachschlagen ({lookup['codes']:,} gültige PLZ): Bitmap {lookup['bitmap_ns']:.0f} ns / "
+          f"{lookup['bitmap_bytes']:,} B, set {lookup['set_ns']:.0f} ns / {lookup['set_bytes']:,} B")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
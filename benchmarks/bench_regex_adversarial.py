@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark Regex-Engines auf bösartigen Eingaben (eingefügte Inhalte)
+
+Alle Pattern-Recognizer aus analyzer-de/recognizers-de.yml laufen einmal auf
+dem backtrackenden `regex` (Presidio-Standard) und einmal auf RE2
+(REGEX_ENGINE=re2), jeweils mit dem Zeitbudget aus analysis_budget.py.
+
+Eingaben: lange Punkt-/Bindestrich-Läufe vor einem "@" (quadratisch für das
+E-Mail-Pattern), ein Base64-Anhang, Ziffernfolgen und zum Vergleich der
+Beispiel-Arztbrief. Ausgegeben werden Laufzeit, Trefferzahl und ob das
+Budget gegriffen hat (partial). Für den Arztbrief wird zusätzlich geprüft,
+dass beide Engines identische Treffer liefern.
+
+Benötigt presidio-analyzer und google-re2:
+    python benchmarks/bench_regex_adversarial.py --sizes 2000,10000,50000 --budget 5
+"""
+
+import argparse
+import base64
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import yaml
+
+ANALYZER_DIR = Path(__file__).resolve().parent.parent / "analyzer-de"
+SAMPLE_TEXT_PATH = Path(__file__).resolve().parent.parent / "tests" / "sample-data" / "beispiel-text.txt"
+sys.path.insert(0, str(ANALYZER_DIR))
+
+from presidio_analyzer import Pattern, PatternRecognizer, RecognizerRegistry  # noqa: E402
+
+from analysis_budget import analysis_budget, install_budget_checks  # noqa: E402
+from regex_engine import install_regex_engine  # noqa: E402
+
+INPUTS: Dict[str, Callable[[int, random.Random], str]] = {
+    "punkte-vor-@": lambda n, rng: "a." * (n // 2) + " @klinik.de",
+    "bindestriche-vor-@": lambda n, rng: "a-" * (n // 2) + "!@klinik.de",
+    "base64-anhang": lambda n, rng: base64.b64encode(rng.randbytes(n * 3 // 4)).decode() + " @klinik.de",
+    "ziffernfolge": lambda n, rng: "0" * n,
+}
+
+
+def build_registry(engine: str) -> RecognizerRegistry:
+    conf = yaml.safe_load((ANALYZER_DIR / "recognizers-de.yml").read_text(encoding="utf-8"))
+    registry = RecognizerRegistry(supported_languages=["de"])
+    for rec in conf["recognizers"]:
+        if "patterns" not in rec:
+            continue
+        registry.add_recognizer(PatternRecognizer(
+            supported_entity=rec["supported_entity"],
+            name=rec["name"],
+            supported_language="de",
+            patterns=[Pattern(p["name"], p["regex"], p["score"]) for p in rec["patterns"]],
+            global_regex_flags=conf["global_regex_flags"],
+        ))
+    install_regex_engine(registry, engine)
+    install_budget_checks(registry)
+    return registry
+
+
+def run(registry: RecognizerRegistry, text: str, budget_seconds: float):
+    started = time.monotonic()
+    with analysis_budget(budget_seconds, started) as budget:
+        results = [
+            r for rec in registry.recognizers
+            for r in rec.analyze(text, rec.supported_entities)
+        ]
+    return results, time.monotonic() - started, sorted(set(budget.skipped)) if budget else []
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="2000,10000,50000", help="Eingabelängen in Zeichen")
+    parser.add_argument("--budget", type=float, default=5.0, help="Zeitbudget pro Dokument (Sekunden)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    registries = {engine: build_registry(engine) for engine in ("regex", "re2")}
+    rng = random.Random(args.seed)
+
+    sample = SAMPLE_TEXT_PATH.read_text(encoding="utf-8")
+    spans = {
+        engine: sorted((r.entity_type, r.start, r.end) for r in run(registry, sample, args.budget)[0])
+        for engine, registry in registries.items()
+    }
+    print(f"Arztbrief: regex {len(spans['regex'])} / re2 {len(spans['re2'])} Treffer, "
+          f"identisch: {'ja' if spans['regex'] == spans['re2'] else 'NEIN'}\n")
+
+    header = f"{'Eingabe':<20} {'Zeichen':>8} {'regex s':>9} {'re2 s':>9} {'Treffer':>9}  partial (regex)"
+    print(header)
+    print("-" * len(header))
+    for name, make in INPUTS.items():
+        for size in (int(s) for s in args.sizes.split(",")):
+            text = make(size, rng)
+            res_regex, t_regex, skipped = run(registries["regex"], text, args.budget)
+            res_re2, t_re2, skipped_re2 = run(registries["re2"], text, args.budget)
+            partial = ", ".join(skipped) if skipped else "-"
+            if skipped_re2:
+                partial += f" | re2: {', '.join(skipped_re2)}"
+            print(f"{name:<20} {len(text):>8} {t_regex:>9.3f} {t_re2:>9.3f} "
+                  f"{len(res_regex):>4}/{len(res_re2):<4}  {partial}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
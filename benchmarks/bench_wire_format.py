@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Benchmark Wire-Format: Bytes und CPU pro Dokument auf beiden Hops
+
+Hop 1: Analyzer -> UI     (Antwort von /analyze)
+Hop 2: UI -> Anonymizer   (Request an /anonymize: Text + Ergebnisse + Operatoren)
+
+Varianten: volle Ergebnisse (wie bisher) oder kompakt (nur
+entity_type/start/end/score), jeweils als JSON oder MessagePack, mit/ohne
+gzip (Level wie WIRE_GZIP_LEVEL). Gemessen werden Kodieren + Dekodieren auf der
+jeweiligen Gegenseite, ohne Netzwerk.
+
+Die Analyzer-Ergebnisse werden aus dem Beispiel-Arztbrief erzeugt (Großwörter
+und Ziffernfolgen als Entitäten, ca. eine Entität pro 17 Zeichen; die genaue
+Zahl steht unter der Tabelle). Weil der Text aus Wiederholungen besteht, fällt die
+gzip-Quote optimistischer aus als bei echten Dokumenten.
+
+Beispiel:
+    python benchmarks/bench_wire_format.py --sizes 10000,100000,1000000
+"""
+
+import argparse
+import gzip
+import json
+import re
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import msgpack
+
+SAMPLE_TEXT_PATH = Path(__file__).resolve().parent.parent / "tests" / "sample-data" / "beispiel-text.txt"
+COMPACT_FIELDS = ("entity_type", "start", "end", "score")
+_ENTITY_PATTERN = re.compile(r"\b(?:[A-ZÄÖÜ][a-zäöüß]{3,}|\d[\d.:/ ]{3,}\d)\b")
+_ENTITY_TYPES = ["PERSON", "LOCATION", "DATE_TIME", "ORGANIZATION", "DE_ZIP_CODE", "ADDRESS"]
+
+
+def build_document(size: int) -> str:
+    base = SAMPLE_TEXT_PATH.read_text(encoding="utf-8")
+    return (base * (size // len(base) + 1))[:size]
+
+
+def full_results(text: str) -> List[Dict[str, Any]]:
+    """Ergebnisse im Format von RecognizerResult.to_dict()"""
+    results = []
+    for i, match in enumerate(_ENTITY_PATTERN.finditer(text)):
+        entity_type = _ENTITY_TYPES[i % len(_ENTITY_TYPES)]
+        results.append({
+            "entity_type": entity_type,
+            "start": match.start(),
+            "end": match.end(),
+            "score": 0.85,
+            "analysis_explanation": None,
+            "recognition_metadata": {
+                "recognizer_name": "SpacyRecognizer" if entity_type in ("PERSON", "LOCATION") else "PatternRecognizer",
+                "recognizer_identifier": "SpacyRecognizer_140234871234560",
+            },
+        })
+    return results
+
+
+def compact(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [{key: r[key] for key in COMPACT_FIELDS} for r in results]
+
+
+def _json_codec() -> Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]:
+    return (lambda obj: json.dumps(obj).encode("utf-8")), json.loads
+
+
+def _msgpack_codec() -> Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]:
+    return msgpack.packb, msgpack.unpackb
+
+
+def measure(obj: Any, codec, gzip_level: Optional[int], repeat: int) -> Dict[str, float]:
+    """Bester von `repeat` Durchläufen (Kodieren / Dekodieren getrennt)"""
+    encode, decode = codec
+    best_enc = best_dec = float("inf")
+    size = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = encode(obj)
+        if gzip_level is not None:
+            body = gzip.compress(body, compresslevel=gzip_level)
+        best_enc = min(best_enc, time.perf_counter() - started)
+        size = len(body)
+
+        started = time.perf_counter()
+        if gzip_level is not None:
+            body = gzip.decompress(body)
+        decode(body)
+        best_dec = min(best_dec, time.perf_counter() - started)
+    return {"bytes": size, "encode_ms": best_enc * 1000, "decode_ms": best_dec * 1000}
+
+
+def variants(gzip_level: int):
+    for name, codec in (("json", _json_codec()), ("msgpack", _msgpack_codec())):
+        yield name, codec, None
+        yield f"{name}+gzip", codec, gzip_level
+
+
+def run(size: int, gzip_level: int, repeat: int) -> List[Dict[str, Any]]:
+    text = build_document(size)
+    full = full_results(text)
+    small = compact(full)
+    anonymizers = {"DEFAULT": {"type": "replace", "new_value": "<ANONYMISIERT>"}}
+
+    rows = []
+    cases = [
+        ("analyze-response", "voll", full),
+        ("analyze-response", "kompakt", small),
+        ("anonymize-request", "voll", {"text": text, "analyzer_results": full, "anonymizers": anonymizers}),
+        ("anonymize-request", "kompakt", {"text": text, "analyzer_results": small, "anonymizers": anonymizers}),
+    ]
+    for hop, results_kind, obj in cases:
+        for encoding, codec, level in variants(gzip_level):
+            row = {"chars": size, "entities": len(full), "hop": hop, "results": results_kind, "encoding": encoding}
+            row.update(measure(obj, codec, level, repeat))
+            rows.append(row)
+    return rows
+
+
+def print_table(rows: List[Dict[str, Any]]) -> None:
+    header = f"{'Zeichen':>9} {'Hop':<18} {'Ergebn.':<8} {'Kodierung':<13} {'Bytes':>11} {'vs. Basis':>9} {'Enc ms':>8} {'Dec ms':>8} {'CPU ms':>8}"
+    print(header)
+    print("-" * len(header))
+    baseline: Dict[Tuple[int, str], Dict[str, Any]] = {}
+    for row in rows:
+        key = (row["chars"], row["hop"])
+        base = baseline.setdefault(key, row)   # erste Zeile = JSON voll = heutiges Verhalten
+        cpu = row["encode_ms"] + row["decode_ms"]
+        print(
+            f"{row['chars']:>9} {row['hop']:<18} {row['results']:<8} {row['encoding']:<13} "
+            f"{row['bytes']:>11,} {row['bytes'] / base['bytes']:>8.0%} "
+            f"{row['encode_ms']:>8.2f} {row['decode_ms']:>8.2f} {cpu:>8.2f}"
+        )
+    print()
+    for chars, entities in {row["chars"]: row["entities"] for row in rows}.items():
+        print(f"{chars:>9,} Zeichen: {entities:,} Entitäten (eine pro {chars / max(entities, 1):.0f} Zeichen)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Dokumentgrößen in Zeichen")
+    parser.add_argument("--gzip-level", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", metavar="DATEI", help="Ergebnisse zusätzlich als JSON speichern")
+    args = parser.parse_args(argv)
+
+    rows = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        rows.extend(run(size, args.gzip_level, args.repeat))
+    print_table(rows)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(rows, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+Lastgenerator für Kapazitätsplanung des Compose-Stacks
+Treibt /analyze und /anonymize (echte Services oder lokale Stand-ins)
+
+Betriebsarten:
+- closed: N gleichzeitige Nutzer, jeder schickt das nächste Dokument nach der Antwort
+- open:   Poisson-Ankünfte mit fester Rate, unabhängig von den Antworten
+          (Latenz ab geplanter Ankunft gemessen -> keine "coordinated omission")
+
+Ausgabe pro Laststufe: Durchsatz, Latenz-Perzentile, Fehlerquote, optional
+Container-Ressourcen (docker stats). Daraus: Sättigungsdurchsatz, Latenz-Knie
+und benötigte Analyzer-Replikas für eine Ziel-Dokumentenzahl pro Stunde.
+
+Beispiele:
+    # Gegen den laufenden Stack (Ports aus der Makefile)
+    python benchmarks/loadtest.py --mode open --rates 0.5,1,2,4 --duration 60 \\
+        --analyzer http://localhost:5002 --anonymizer http://localhost:5001 \\
+        --docker-stats --target-docs-per-hour 20000
+
+    # Latenzprofil aus dem echten Stack aufzeichnen ...
+    python benchmarks/loadtest.py --mode closed --concurrency 1 --duration 120 \\
+        --record-profile benchmarks/profiles/mein-server.json
+    # ... und offline mit Stand-in-Services nachspielen
+    python benchmarks/loadtest.py --stub benchmarks/profiles/compose-default.json \\
+        --mode closed --concurrency 1,2,4,8
+"""
+
+import argparse
+import contextlib
+import json
+import math
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+SAMPLE_TEXT_PATH = Path(__file__).resolve().parent.parent / "tests" / "sample-data" / "beispiel-text.txt"
+
+
+# ---------------------------------------------------------------------------
+# Dokumente
+# ---------------------------------------------------------------------------
+
+def parse_size_mix(spec: str) -> List[Tuple[int, float]]:
+    """ "500:0.5,2000:0.3,10000:0.2" -> [(500, 0.5), (2000, 0.3), (10000, 0.2)] """
+    mix = []
+    for part in spec.split(","):
+        size, _, weight = part.partition(":")
+        mix.append((int(size), float(weight or 1)))
+    return mix
+
+
+def build_documents(mix: List[Tuple[int, float]]) -> Dict[int, str]:
+    """Ein Dokument pro Größe, aufgefüllt mit dem Beispiel-Arztbrief"""
+    base = SAMPLE_TEXT_PATH.read_text(encoding="utf-8")
+    docs = {}
+    for size, _ in mix:
+        repeated = base * (size // len(base) + 1)
+        docs[size] = repeated[:size]
+    return docs
+
+
+# ---------------------------------------------------------------------------
+# Messung
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Sample:
+    chars: int
+    latency: float                     # Sekunden, ab geplanter Ankunft
+    ok: bool
+    endpoint_latency: Dict[str, float] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+class Client:
+    """Ein Dokument = /analyze (+ optional /anonymize), wie in der UI"""
+
+    def __init__(self, analyzer: str, anonymizer: str, flow: str, timeout: float):
+        self.analyzer = analyzer.rstrip("/")
+        self.anonymizer = anonymizer.rstrip("/")
+        self.flow = flow
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def _post(self, url: str, payload: Dict[str, Any]) -> Tuple[Any, float]:
+        started = time.perf_counter()
+        resp = self._session().post(url, json=payload, timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.json(), time.perf_counter() - started
+
+    def process(self, text: str, scheduled: float) -> Sample:
+        endpoint_latency = {}
+        try:
+            results, endpoint_latency["analyze"] = self._post(
+                f"{self.analyzer}/analyze", {"text": text, "language": "de"}
+            )
+            if self.flow == "both":
+                _, endpoint_latency["anonymize"] = self._post(
+                    f"{self.anonymizer}/anonymize", {"text": text, "analyzer_results": results}
+                )
+            ok, error = True, None
+        except requests.exceptions.RequestException as e:
+            ok, error = False, type(e).__name__
+        return Sample(len(text), time.perf_counter() - scheduled, ok, endpoint_latency, error)
+
+
+def percentile(values: List[float], p: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * p / 100
+    lo, hi = math.floor(k), math.ceil(k)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+class DockerStats:
+    """Sammelt `docker stats` im Hintergrund (CPU %, Speicher) pro Container"""
+
+    def __init__(self, interval: float = 2.0):
+        self.interval = interval
+        self.samples: Dict[str, List[Tuple[float, float]]] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                out = subprocess.run(
+                    ["docker", "stats", "--no-stream", "--format", "{{json .}}"],
+                    capture_output=True, text=True, timeout=30,
+                ).stdout
+            except (OSError, subprocess.TimeoutExpired):
+                return
+            for line in out.splitlines():
+                row = json.loads(line)
+                cpu = float(row["CPUPerc"].rstrip("%") or 0)
+                mem = _parse_mem(row["MemUsage"].split("/")[0].strip())
+                self.samples.setdefault(row["Name"], []).append((cpu, mem))
+            self._stop.wait(self.interval)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {
+            name: {
+                "cpu_mean": statistics.mean(c for c, _ in rows),
+                "cpu_max": max(c for c, _ in rows),
+                "mem_max_mib": max(m for _, m in rows),
+            }
+            for name, rows in self.samples.items() if rows
+        }
+
+
+def _parse_mem(value: str) -> float:
+    units = {"B": 1 / 2**20, "KiB": 1 / 1024, "MiB": 1, "GiB": 1024, "kB": 1 / 1024, "MB": 1, "GB": 1024}
+    for unit in sorted(units, key=len, reverse=True):
+        if value.endswith(unit):
+            return float(value[: -len(unit)]) * units[unit]
+    return float("nan")
+
+
+# ---------------------------------------------------------------------------
+# Laststufen
+# ---------------------------------------------------------------------------
+
+def pick_size(mix: List[Tuple[int, float]], rng: random.Random) -> int:
+    sizes, weights = zip(*mix)
+    return rng.choices(sizes, weights=weights)[0]
+
+
+def run_closed(client: Client, docs, mix, users: int, duration: float, seed: int) -> Tuple[List[Sample], float]:
+    samples: List[Sample] = []
+    lock = threading.Lock()
+    start = time.perf_counter()
+    deadline = start + duration
+
+    def user(i: int):
+        rng = random.Random(seed + i)
+        while time.perf_counter() < deadline:
+            sample = client.process(docs[pick_size(mix, rng)], time.perf_counter())
+            with lock:
+                samples.append(sample)
+
+    threads = [threading.Thread(target=user, args=(i,)) for i in range(users)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return samples, time.perf_counter() - start
+
+
+def run_open(
+    client: Client, docs, mix, rate: float, duration: float, seed: int, max_inflight: int
+) -> Tuple[List[Sample], float]:
+    rng = random.Random(seed)
+    futures = []
+    start = time.perf_counter()
+    next_arrival = start
+    with ThreadPoolExecutor(max_workers=max_inflight) as pool:
+        while next_arrival < start + duration:
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(pool.submit(client.process, docs[pick_size(mix, rng)], next_arrival))
+            next_arrival += rng.expovariate(rate)
+    samples = [f.result() for f in futures]
+    # Mindestens die Ankunftsdauer (die letzte Ankunft kann deutlich vor deren Ende
+    # liegen), bei Rückstau die Wanduhrzeit bis zur letzten Antwort
+    return samples, max(duration, time.perf_counter() - start)
+
+
+def summarize(level: str, samples: List[Sample], elapsed: float, offered: Optional[float]) -> Dict[str, Any]:
+    latencies = [s.latency for s in samples if s.ok]
+    errors = sum(not s.ok for s in samples)
+    row = {
+        "level": level,
+        "offered_per_s": offered,
+        "completed": len(latencies),
+        "throughput_per_s": len(latencies) / elapsed,
+        # Analyzer allein (für die Replika-Empfehlung), auch wenn /anonymize danach scheitert
+        "analyze_per_s": sum("analyze" in s.endpoint_latency for s in samples) / elapsed,
+        "error_rate": errors / len(samples) if samples else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+    for endpoint in ("analyze", "anonymize"):
+        values = [s.endpoint_latency[endpoint] for s in samples if endpoint in s.endpoint_latency]
+        if values:
+            row[f"{endpoint}_p95_ms"] = percentile(values, 95) * 1000
+    return row
+
+
+def find_knee(rows: List[Dict[str, Any]], factor: float) -> Optional[Dict[str, Any]]:
+    """Erste Stufe, in der p95 > factor * p95 der ersten Stufe oder der Durchsatz das Angebot verfehlt"""
+    baseline = rows[0]["p95_ms"]
+    for row in rows[1:]:
+        under_delivered = row["offered_per_s"] and row["throughput_per_s"] < 0.9 * row["offered_per_s"]
+        if row["p95_ms"] > factor * baseline or under_delivered:
+            return row
+    return None
+
+
+def record_profile(samples: List[Sample], path: str, workers: Dict[str, int]) -> None:
+    """Lineares Latenzmodell (Basis + pro 1000 Zeichen) je Endpoint, per Kleinste-Quadrate"""
+    profile: Dict[str, Any] = {}
+    for endpoint in ("analyze", "anonymize"):
+        points = [(s.chars / 1000, s.endpoint_latency[endpoint] * 1000) for s in samples if endpoint in s.endpoint_latency]
+        if len(points) < 2:
+            continue
+        xs, ys = zip(*points)
+        mean_x, mean_y = statistics.mean(xs), statistics.mean(ys)
+        var_x = sum((x - mean_x) ** 2 for x in xs) or 1.0
+        slope = sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+        residuals = [y - (mean_y + slope * (x - mean_x)) for x, y in points]
+        profile[endpoint] = {
+            "workers": workers[endpoint],
+            "base_ms": round(max(mean_y - slope * mean_x, 0.0), 2),
+            "per_kchar_ms": round(max(slope, 0.0), 2),
+            "jitter": round(statistics.pstdev(residuals) / mean_y, 3) if mean_y else 0.0,
+        }
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text(json.dumps(profile, indent=2) + "\n", encoding="utf-8")
+    print(f"Latenzprofil gespeichert: {path}")
+
+
+# ---------------------------------------------------------------------------
+# Stand-in-Services
+# ---------------------------------------------------------------------------
+
+def start_stub(profile_path: str) -> Tuple[str, ThreadingHTTPServer]:
+    """
+    Lokaler Ersatz für Analyzer + Anonymizer mit aufgezeichnetem Latenzprofil.
+
+    "workers" je Endpoint begrenzt (wie gunicorn -w) die gleichzeitig bearbeiteten
+    Requests, alle weiteren warten -> Sättigung und Warteschlange verhalten sich
+    realistisch. Analyzer und Anonymizer sind getrennte Container und arbeiten
+    daher parallel (eigene Slots pro Endpoint).
+    """
+    profile = json.loads(Path(profile_path).read_text(encoding="utf-8"))
+    slots = {
+        endpoint: threading.Semaphore(model.get("workers", profile.get("workers", 1)))
+        for endpoint, model in profile.items() if isinstance(model, dict)
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            endpoint = self.path.strip("/")
+            model = profile.get(endpoint)
+            if model is None:
+                self.send_error(404)
+                return
+            text = body.get("text", "")
+            service_ms = model["base_ms"] + model["per_kchar_ms"] * len(text) / 1000
+            service_ms *= max(random.gauss(1.0, model.get("jitter", 0.0)), 0.1)
+            with slots[endpoint]:
+                time.sleep(service_ms / 1000)
+            if endpoint == "analyze":
+                result: Any = [{"entity_type": "PERSON", "start": 0, "end": min(5, len(text)), "score": 0.85}]
+            else:
+                result = {"text": text, "items": []}
+            data = json.dumps(result).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}", server
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def print_table(rows: List[Dict[str, Any]]) -> None:
+    header = f"{'Stufe':>10} {'Angebot/s':>10} {'Durchsatz/s':>12} {'Fehler':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        offered = f"{row['offered_per_s']:.2f}" if row["offered_per_s"] else "-"
+        print(
+            f"{row['level']:>10} {offered:>10} {row['throughput_per_s']:>12.2f} {row['error_rate']:>6.1%} "
+            f"{row['p50_ms']:>9.0f} {row['p95_ms']:>9.0f} {row['p99_ms']:>9.0f}"
+        )
+        for name, res in row.get("resources", {}).items():
+            print(f"{'':>10}   {name}: CPU Ø {res['cpu_mean']:.0f}% / max {res['cpu_max']:.0f}%, RAM max {res['mem_max_mib']:.0f} MiB")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--analyzer", default=os.environ.get("ANALYZER_API", "http://localhost:5002"))
+    parser.add_argument("--anonymizer", default=os.environ.get("ANONYMIZER_API", "http://localhost:5001"))
+    parser.add_argument("--stub", metavar="PROFIL.json", help="Stand-in-Services mit Latenzprofil statt echter Endpoints")
+    parser.add_argument("--mode", choices=["open", "closed"], default="open")
+    parser.add_argument("--rates", default="0.5,1,2,4", help="open: Ankunftsraten in Dokumenten/s")
+    parser.add_argument("--concurrency", default="1,2,4,8", help="closed: gleichzeitige Nutzer")
+    parser.add_argument("--duration", type=float, default=60, help="Sekunden pro Laststufe")
+    parser.add_argument("--sizes", default="500:0.5,2000:0.3,10000:0.2", help="Dokumentgrößen (Zeichen:Gewicht)")
+    parser.add_argument("--flow", choices=["analyze", "both"], default="both")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--max-inflight", type=int, default=256, help="open: max. offene Requests")
+    parser.add_argument("--knee-factor", type=float, default=2.0, help="Knie: p95 > Faktor * p95 der ersten Stufe")
+    parser.add_argument("--docker-stats", action="store_true", help="Container-Ressourcen mitschneiden")
+    parser.add_argument("--target-docs-per-hour", type=float, help="Ziel für die Replika-Empfehlung")
+    parser.add_argument("--headroom", type=float, default=0.7, help="Ziel-Auslastung pro Replika (0-1)")
+    parser.add_argument("--analyzer-cpus", type=float, default=1.5, help="CPU-Limit des Analyzers (docker-compose.yaml)")
+    parser.add_argument("--record-profile", metavar="PROFIL.json", help="Latenzprofil aus der ersten Stufe speichern")
+    parser.add_argument("--workers", type=int, default=1, help="gunicorn-Worker des gemessenen Analyzers (für das Profil)")
+    parser.add_argument("--anonymizer-workers", type=int, default=1, help="gunicorn-Worker des gemessenen Anonymizers (für das Profil)")
+    parser.add_argument("--json", metavar="DATEI", help="Ergebnisse zusätzlich als JSON speichern")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    if args.stub:
+        url, _ = start_stub(args.stub)
+        args.analyzer = args.anonymizer = url
+        print(f"Stand-in-Services ({args.stub}) auf {url}")
+
+    mix = parse_size_mix(args.sizes)
+    docs = build_documents(mix)
+    client = Client(args.analyzer, args.anonymizer, args.flow, args.timeout)
+
+    levels = args.rates if args.mode == "open" else args.concurrency
+    rows = []
+    for i, level in enumerate(levels.split(",")):
+        label = f"{level}/s" if args.mode == "open" else f"{level} N."
+        print(f"Laststufe {label} ({args.duration:.0f}s) ...", file=sys.stderr)
+        stats = DockerStats() if args.docker_stats else None
+        with stats or contextlib.nullcontext():
+            if args.mode == "open":
+                samples, elapsed = run_open(
+                    client, docs, mix, float(level), args.duration, args.seed + i, args.max_inflight
+                )
+                row = summarize(label, samples, elapsed, float(level))
+            else:
+                samples, elapsed = run_closed(client, docs, mix, int(level), args.duration, args.seed + i)
+                row = summarize(label, samples, elapsed, None)
+        if stats:
+            row["resources"] = stats.summary()
+        rows.append(row)
+        if i == 0 and args.record_profile:
+            record_profile(samples, args.record_profile, {"analyze": args.workers, "anonymize": args.anonymizer_workers})
+
+    print()
+    print_table(rows)
+    print()
+
+    saturation = max(rows, key=lambda r: r["throughput_per_s"])
+    knee = find_knee(rows, args.knee_factor) if len(rows) > 1 else None
+    print(f"Sättigungsdurchsatz: {saturation['throughput_per_s']:.2f} Dok./s "
+          f"({saturation['throughput_per_s'] * 3600:.0f} Dok./h) bei Stufe {saturation['level']}")
+    print(f"Latenz-Knie: {'Stufe ' + knee['level'] if knee else 'nicht erreicht'}")
+
+    report: Dict[str, Any] = {"rows": rows, "saturation": saturation, "knee": knee}
+    if args.target_docs_per_hour:
+        # Replikas skalieren nur den Analyzer -> dessen Durchsatz zählt, nicht der Gesamtfluss
+        analyzer_peak = max(rows, key=lambda r: r["analyze_per_s"])
+        per_replica = analyzer_peak["analyze_per_s"] * 3600 * args.headroom
+        replicas = math.ceil(args.target_docs_per_hour / per_replica) if per_replica else None
+        report["replicas"] = replicas
+        report["analyzer_saturation"] = analyzer_peak
+        print(f"Analyzer-Durchsatz max.: {analyzer_peak['analyze_per_s']:.2f} Anfragen/s bei Stufe {analyzer_peak['level']}")
+        print(f"Ziel {args.target_docs_per_hour:.0f} Dok./h bei {args.headroom:.0%} Auslastung: "
+              f"{replicas} Analyzer-Replika(s) à {per_replica:.0f} Dok./h")
+        if analyzer_peak.get("anonymize_p95_ms", 0) > analyzer_peak.get("analyze_p95_ms", float("inf")):
+            print("  Hinweis: /anonymize ist langsamer als /analyze und begrenzt den Fluss; "
+                  "für die Analyzer-Kapazität mit --flow analyze messen")
+        analyzer = {n: r for n, r in analyzer_peak.get("resources", {}).items() if "analyzer" in n}
+        for name, res in analyzer.items():
+            # docker stats: 100% = 1 Kern; Limit aus docker-compose.yaml (--analyzer-cpus)
+            if res["cpu_max"] < 70 * args.analyzer_cpus:
+                print(f"  {name}: CPU max {res['cpu_max']:.0f}% von {args.analyzer_cpus * 100:.0f}% -> "
+                      f"CPU-Limit nicht ausgeschöpft, zuerst WORKERS erhöhen")
+            else:
+                print(f"  {name}: CPU max {res['cpu_max']:.0f}% von {args.analyzer_cpus * 100:.0f}% -> "
+                      f"CPU-gebunden, über Replikas skalieren")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2, default=str) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
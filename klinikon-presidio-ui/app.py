@@ -12,7 +12,8 @@ from helpers import (
     anonymize_text,
     check_service_health,
     get_anonymizer_config,
-    MEDICAL_ANONYMIZERS
+    MEDICAL_ANONYMIZERS,
+    tracer
 )
 
 # Logging
@@ -84,8 +85,11 @@ def render_sidebar():
         if st.button("Status prüfen"):
             with st.spinner("Prüfe Services..."):
                 health = check_service_health()
+                analyzer_status = health["analyzer_details"].get("status")
                 if health["analyzer"]:
                     st.success("✅ Analyzer aktiv")
+                elif analyzer_status in ("pending", "warming_up"):
+                    st.warning("⏳ Analyzer startet (Warm-up läuft)")
                 else:
                     st.error("❌ Analyzer nicht erreichbar")
 
@@ -103,7 +107,7 @@ def render_sidebar():
             options=[
                 "Vollständig (Platzhalter)",
                 "Teilweise (Maskierung)",
-                "Konsistent (Hash)"
+                "Konsistent (Pseudonym)"
             ],
             help=(
                 "**Vollständig (Platzhalter)**: Alle identifizierenden Angaben werden komplett durch Platzhalter "
@@ -111,8 +115,10 @@ def render_sidebar():
                 "Kein Rückbezug möglich.\n\n"
                 "**Teilweise (Maskierung)**: Teile sensibler Angaben bleiben zur Orientierung sichtbar "
                 "(z.B. Max M******, 089 ****123). Für interne Qualitätssicherung.\n\n"
-                "**Konsistent (Hash)**: Daten werden durch stabile Codes ersetzt (gleicher Patient ⇒ gleicher Code). "
-                "Geeignet für Längsschnitt-Analysen. Hinweis: Keine echte Anonymisierung im DSGVO-Sinne."
+                "**Konsistent (Pseudonym)**: Daten werden durch stabile, lesbare Pseudonyme ersetzt "
+                "(z.B. `Person-000123`; gleicher Patient ⇒ gleiches Pseudonym, auch über Dokumente hinweg). "
+                "Geeignet für Längsschnitt-Analysen. Die Zuordnung liegt verschlüsselt im Pseudonym-Vault. "
+                "Hinweis: Keine echte Anonymisierung im DSGVO-Sinne."
             )
         )
 
@@ -317,6 +323,12 @@ def main():
                     )
                     st.session_state.analysis_results = results
                     st.success(f"✅ Analyse abgeschlossen: **{len(results)}** Entitäten erkannt")
+                    if results.partial:
+                        st.warning(
+                            "⚠️ Analyse unvollständig: Zeitbudget des Analyzers überschritten. "
+                            "Nicht alle Entitäten wurden gesucht – Ergebnis vor Weitergabe prüfen! "
+                            f"(Übersprungen: {', '.join(results.skipped)})"
+                        )
 
             except Exception as e:
                 st.error(f"❌ Fehler bei der Analyse: {str(e)}")
@@ -390,10 +402,12 @@ def main():
     st.markdown(
         "<small>**Klinikon Pseudonymisierer** | "
         "Powered by Microsoft Presidio | "
-        "Keine Daten werden gespeichert</small>",
+        "Keine Texte werden gespeichert</small>",
         unsafe_allow_html=True
     )
 
 
 if __name__ == "__main__":
-    main()
+    # Jeder Streamlit-Rerun ist ein eigener Trace (Root-Span)
+    with tracer.start_as_current_span("ui.rerun"):
+        main()
@@ -4,12 +4,19 @@ Kommunikation mit Analyzer und Anonymizer APIs
 """
 
 import os
+import time
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Mapping, Optional, Tuple
 import requests
 from requests.adapters import HTTPAdapter
 from requests.packages.urllib3.util.retry import Retry
 
+from tracing import setup_tracing, get_tracer, outgoing_headers
+from pseudonym_vault import get_vault, format_surrogate
+from wire_format import encode_request, decode_response
+
 # Logging-Konfiguration
 LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
 logging.basicConfig(
@@ -22,6 +29,21 @@ logger = logging.getLogger(__name__)
 ANALYZER_API = os.environ.get("ANALYZER_API", "http://presidio-analyzer:3000")
 ANONYMIZER_API = os.environ.get("ANONYMIZER_API", "http://presidio-anonymizer:3000")
 
+# Health-Checks: kurzer Timeout, Ergebnis kurz zwischenspeichern
+HEALTH_TIMEOUT = float(os.environ.get("HEALTH_TIMEOUT", "2"))
+HEALTH_CACHE_TTL = float(os.environ.get("HEALTH_CACHE_TTL", "10"))
+_health_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="health")
+_health_lock = threading.Lock()
+_health_cache: Tuple[float, Optional[Dict[str, Any]]] = (0.0, None)
+
+# Analyzer liefert nur entity_type/start/end/score (ohne Erklärungen/Metadaten)
+ANALYZER_COMPACT_RESULTS = os.environ.get("ANALYZER_COMPACT_RESULTS", "true").lower() == "true"
+COMPACT_FIELDS = ("entity_type", "start", "end", "score")
+
+# Tracing (Exporter über TRACING_EXPORTER, siehe tracing.py)
+setup_tracing("klinikon-presidio-ui")
+tracer = get_tracer(__name__)
+
 # Retry-Strategie für robuste API-Calls
 def get_session_with_retry() -> requests.Session:
     """Erstellt Session mit automatischem Retry bei Netzwerkfehlern"""
@@ -38,12 +60,49 @@ def get_session_with_retry() -> requests.Session:
     return session
 
 
+class AnalysisResults(list):
+    """
+    Analyzer-Ergebnisse (Liste) mit Hinweis auf abgebrochene Analysen:
+    partial=True, wenn der Analyzer sein Zeitbudget überschritten und
+    Recognizer übersprungen hat (skipped = deren Namen).
+    """
+
+    def __init__(self, results: List[Dict[str, Any]], partial: bool = False, skipped: Optional[List[str]] = None):
+        super().__init__(results)
+        self.partial = partial
+        self.skipped = skipped or []
+
+
+def _post(url: str, payload: Dict[str, Any], timeout: int = 30) -> Tuple[Any, Mapping[str, str]]:
+    """
+    POST an einen Presidio-Service (Wire-Format siehe wire_format.py); jede Phase
+    (Session, Serialisierung, Netzwerk, Deserialisierung) ist ein eigener Span.
+    Trace-Kontext wird per Header propagiert. Liefert (Daten, Antwort-Header).
+    """
+    with tracer.start_as_current_span("session.setup"):
+        session = get_session_with_retry()
+
+    with tracer.start_as_current_span("request.serialize") as span:
+        body, headers = encode_request(payload)
+        span.set_attribute("payload.bytes", len(body))
+
+    with tracer.start_as_current_span("http.post") as span:
+        response = session.post(url, data=body, headers={**headers, **outgoing_headers()}, timeout=timeout)
+        span.set_attribute("http.status_code", response.status_code)
+        span.set_attribute("response.bytes", int(response.headers.get("Content-Length", 0)))
+    response.raise_for_status()
+
+    with tracer.start_as_current_span("response.deserialize"):
+        return decode_response(response), response.headers
+
+
 def analyze_text(
     text: str,
     language: str = "de",
     entities: Optional[List[str]] = None,
-    score_threshold: float = 0.0
-) -> List[Dict[str, Any]]:
+    score_threshold: float = 0.0,
+    compact: bool = ANALYZER_COMPACT_RESULTS
+) -> AnalysisResults:
     """
     Analysiert Text mit Presidio Analyzer (deutsche medizinische Entitäten).
 
@@ -52,9 +111,11 @@ def analyze_text(
         language: Sprache (Standard: "de")
         entities: Liste spezifischer Entitäten oder None für alle
         score_threshold: Min. Konfidenz-Score (0.0 - 1.0)
+        compact: Nur entity_type/start/end/score anfordern (kleinere Antwort)
 
     Returns:
-        Liste der erkannten Entitäten mit Metadaten
+        AnalysisResults: Liste der erkannten Entitäten (mit Metadaten, falls
+        compact=False); partial=True, wenn der Analyzer abgebrochen hat
 
     Raises:
         requests.exceptions.RequestException: Bei API-Fehlern
@@ -65,21 +126,28 @@ def analyze_text(
         "score_threshold": score_threshold
     }
 
+    if compact:
+        payload["compact"] = True
+
     if entities:
         payload["entities"] = entities
 
     logger.info(f"Analysiere Text (Länge: {len(text)} Zeichen)")
 
     try:
-        session = get_session_with_retry()
-        response = session.post(
-            f"{ANALYZER_API}/analyze",
-            json=payload,
-            timeout=30
-        )
-        response.raise_for_status()
-
-        results = response.json()
+        with tracer.start_as_current_span("analyze_text") as span:
+            span.set_attribute("text.length", len(text))
+            span.set_attribute("entities.requested", len(entities or []))
+            data, headers = _post(f"{ANALYZER_API}/analyze", payload)
+            results = AnalysisResults(
+                data,
+                partial=headers.get("X-Analysis-Partial") == "true",
+                skipped=[name for name in headers.get("X-Analysis-Skipped", "").split(",") if name],
+            )
+            span.set_attribute("results.count", len(results))
+            span.set_attribute("analysis.partial", results.partial)
+        if results.partial:
+            logger.warning(f"Analyse unvollständig (Zeitbudget), übersprungen: {results.skipped}")
         logger.info(f"Analyse erfolgreich: {len(results)} Entitäten gefunden")
         return results
 
@@ -97,6 +165,58 @@ def analyze_text(
         raise
 
 
+# Operator-Typ für Vault-Pseudonyme; wird vor dem Anonymizer-Call aufgelöst
+PSEUDONYM_OPERATOR = "pseudonym"
+
+
+def _apply_pseudonyms(
+    text: str,
+    analyzer_results: List[Dict[str, Any]],
+    anonymizers: Optional[Dict[str, Dict[str, Any]]]
+) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Dict[str, Any]]], Dict[str, str]]:
+    """
+    Löst Operatoren vom Typ "pseudonym" über den Pseudonym-Vault auf.
+
+    Der Anonymizer kennt nur einen Operator pro Entity-Typ. Jeder Ersatzwert
+    bekommt daher einen eigenen Entity-Typ ("PERSON#Person-000123") mit einem
+    "replace"-Operator; die Zuordnung zurück auf den echten Typ wird mitgeliefert.
+
+    Returns:
+        (analyzer_results, anonymizers, ursprüngliche Entity-Typen je synthetischem Typ)
+    """
+    if not anonymizers:
+        return analyzer_results, anonymizers, {}
+
+    default = anonymizers.get("DEFAULT", {})
+
+    def operator_for(entity_type: str) -> Dict[str, Any]:
+        return anonymizers.get(entity_type, default)
+
+    targets = [r for r in analyzer_results if operator_for(r["entity_type"]).get("type") == PSEUDONYM_OPERATOR]
+    if not targets:
+        return analyzer_results, anonymizers, {}
+
+    with tracer.start_as_current_span("pseudonym_vault.resolve") as span:
+        span.set_attribute("entities.count", len(targets))
+        seqs = iter(get_vault().resolve([(r["entity_type"], text[r["start"]:r["end"]]) for r in targets]))
+
+    operators = {t: op for t, op in anonymizers.items() if op.get("type") != PSEUDONYM_OPERATOR}
+    results = []
+    original_types = {}
+    for r in analyzer_results:
+        op = operator_for(r["entity_type"])
+        if op.get("type") != PSEUDONYM_OPERATOR:
+            results.append(r)
+            continue
+        surrogate = format_surrogate(op.get("prefix", r["entity_type"]), next(seqs))
+        synthetic_type = f"{r['entity_type']}#{surrogate}"
+        operators[synthetic_type] = {"type": "replace", "new_value": surrogate}
+        original_types[synthetic_type] = r["entity_type"]
+        results.append({**r, "entity_type": synthetic_type})
+
+    return results, operators, original_types
+
+
 def anonymize_text(
     text: str,
     analyzer_results: List[Dict[str, Any]],
@@ -116,26 +236,30 @@ def anonymize_text(
     Raises:
         requests.exceptions.RequestException: Bei API-Fehlern
     """
-    payload = {
-        "text": text,
-        "analyzer_results": analyzer_results
-    }
-
-    if anonymizers:
-        payload["anonymizers"] = anonymizers
-
     logger.info(f"Anonymisiere Text mit {len(analyzer_results)} Entitäten")
 
     try:
-        session = get_session_with_retry()
-        response = session.post(
-            f"{ANONYMIZER_API}/anonymize",
-            json=payload,
-            timeout=30
-        )
-        response.raise_for_status()
-
-        result = response.json()
+        with tracer.start_as_current_span("anonymize_text") as span:
+            span.set_attribute("text.length", len(text))
+            span.set_attribute("results.count", len(analyzer_results))
+
+            analyzer_results, anonymizers, original_types = _apply_pseudonyms(
+                text, analyzer_results, anonymizers
+            )
+            # Der Anonymizer braucht nur Typ, Position und Score
+            payload = {
+                "text": text,
+                "analyzer_results": [
+                    {k: r[k] for k in COMPACT_FIELDS if k in r} for r in analyzer_results
+                ]
+            }
+            if anonymizers:
+                payload["anonymizers"] = anonymizers
+
+            result, _ = _post(f"{ANONYMIZER_API}/anonymize", payload)
+            for item in result.get("items", []):
+                item["entity_type"] = original_types.get(item["entity_type"], item["entity_type"])
+            span.set_attribute("items.count", len(result.get("items", [])))
         logger.info("Anonymisierung erfolgreich")
         return result
 
@@ -153,28 +277,59 @@ def anonymize_text(
         raise
 
 
-def check_service_health() -> Dict[str, bool]:
+def _probe(url: str) -> Dict[str, Any]:
+    """Einzelner Health-Probe; liefert HTTP-Status und (falls vorhanden) JSON-Details"""
+    try:
+        resp = requests.get(url, timeout=HEALTH_TIMEOUT)
+    except Exception as e:
+        logger.warning(f"Health-Check {url} fehlgeschlagen: {e}")
+        return {"ok": False, "status": "unreachable"}
+
+    details = {}
+    if resp.headers.get("Content-Type", "").startswith("application/json"):
+        try:
+            details = resp.json()
+        except ValueError as e:
+            logger.warning(f"Health-Check {url}: ungültiges JSON ({e})")
+            return {"ok": False, "status": str(resp.status_code)}
+        if not isinstance(details, dict):
+            logger.warning(f"Health-Check {url}: JSON-Antwort ist kein Objekt")
+            return {"ok": False, "status": str(resp.status_code)}
+    return {"ok": resp.status_code == 200, "status": details.get("status", str(resp.status_code)), **details}
+
+
+def check_service_health() -> Dict[str, Any]:
     """
     Prüft Health-Status der Presidio-Services.
 
+    Beide Services werden parallel mit kurzem Timeout geprüft. Das Ergebnis wird
+    HEALTH_CACHE_TTL Sekunden zwischengespeichert, damit wiederholte Klicks in der
+    Sidebar die Services nicht belasten.
+
     Returns:
-        Dict mit Status für analyzer und anonymizer
+        Dict mit Status für analyzer (bereit = Warm-up abgeschlossen) und anonymizer,
+        sowie "analyzer_details" (Warm-up-Status, Modell- und Gazetteer-Version)
     """
-    health = {"analyzer": False, "anonymizer": False}
-
-    try:
-        resp = requests.get(f"{ANALYZER_API}/health", timeout=5)
-        health["analyzer"] = resp.status_code == 200
-    except Exception as e:
-        logger.warning(f"Analyzer Health-Check fehlgeschlagen: {e}")
-
-    try:
-        resp = requests.get(f"{ANONYMIZER_API}/health", timeout=5)
-        health["anonymizer"] = resp.status_code == 200
-    except Exception as e:
-        logger.warning(f"Anonymizer Health-Check fehlgeschlagen: {e}")
-
-    return health
+    global _health_cache
+    with _health_lock:
+        cached_at, cached = _health_cache
+        if cached is not None and time.monotonic() - cached_at < HEALTH_CACHE_TTL:
+            return cached
+
+        futures = {
+            "analyzer": _health_executor.submit(_probe, f"{ANALYZER_API}/health/ready"),
+            "anonymizer": _health_executor.submit(_probe, f"{ANONYMIZER_API}/health"),
+        }
+        analyzer = futures["analyzer"].result()
+        anonymizer = futures["anonymizer"].result()
+
+        health = {
+            "analyzer": analyzer["ok"],
+            "anonymizer": anonymizer["ok"],
+            "analyzer_details": analyzer,
+        }
+        _health_cache = (time.monotonic(), health)
+        return health
 
 
 # Vordefinierte Anonymisierungs-Strategien für medizinischen Kontext
@@ -202,12 +357,18 @@ MEDICAL_ANONYMIZERS = {
         "EMAIL_ADDRESS": {"type": "mask", "masking_char": "*", "chars_to_mask": 5, "from_end": False},
         "DE_IBAN": {"type": "mask", "masking_char": "X", "chars_to_mask": 12, "from_end": True},
     },
-    "Konsistent (Hash)": {
-        "DEFAULT": {"type": "hash", "hash_type": "sha256"},
-        "PERSON": {"type": "hash", "hash_type": "md5"},
-        "ADDRESS": {"type": "hash", "hash_type": "sha256"},
-        "DE_KVNR": {"type": "hash", "hash_type": "sha256"},
-        "PATIENT_ID": {"type": "hash", "hash_type": "sha256"},
+    "Konsistent (Pseudonym)": {
+        "DEFAULT": {"type": "pseudonym"},
+        "PERSON": {"type": "pseudonym", "prefix": "Person"},
+        "LOCATION": {"type": "pseudonym", "prefix": "Ort"},
+        "ORGANIZATION": {"type": "pseudonym", "prefix": "Einrichtung"},
+        "ADDRESS": {"type": "pseudonym", "prefix": "Adresse"},
+        "DE_KVNR": {"type": "pseudonym", "prefix": "KVNR"},
+        "PATIENT_ID": {"type": "pseudonym", "prefix": "PID"},
+        "DE_PHONE_NUMBER": {"type": "pseudonym", "prefix": "Telefon"},
+        "EMAIL_ADDRESS": {"type": "pseudonym", "prefix": "Email"},
+        "DE_IBAN": {"type": "pseudonym", "prefix": "IBAN"},
+        "DATE_OF_BIRTH": {"type": "pseudonym", "prefix": "Geburtsdatum"},
     }
 }
 
@@ -217,7 +378,7 @@ def get_anonymizer_config(strategy: str = "Vollständig (Platzhalter)") -> Dict[
     Gibt vordefinierte Anonymisierungs-Konfiguration zurück.
 
     Args:
-        strategy: "Vollständig (Platzhalter)", "Teilweise (Maskierung)", oder "Konsistent (Hash)"
+        strategy: "Vollständig (Platzhalter)", "Teilweise (Maskierung)", oder "Konsistent (Pseudonym)"
 
     Returns:
         Anonymizer-Konfiguration für anonymize_text()
@@ -0,0 +1,239 @@
+"""
+Pseudonym-Vault für Klinikon Pseudonymisierer
+Stabile, lesbare Ersatzwerte (z.B. "Person-000123") pro (Entity-Typ, normalisierter Wert)
+
+Speicherung:
+- Lokale SQLite-Datenbank (WAL-Modus, mehrere Batch-Worker/Prozesse gleichzeitig)
+- Nachschlageschlüssel = HMAC-SHA256 über (Entity-Typ, Wert) -> kein Klartext im Index
+- Originalwert (erste gesehene Schreibweise) nur verschlüsselt (Fernet/AES);
+  autorisierte Re-Identifikation über PseudonymVault.reidentify()
+- Vergabe laufender Nummern pro Entity-Typ in einer Schreib-Transaktion (BEGIN IMMEDIATE)
+
+Ein In-Memory-LRU vor der Datenbank sorgt dafür, dass wiederholte Entitäten
+nie die Festplatte berühren. Nachschlagen und Einfügen erfolgt gebündelt pro Dokument.
+"""
+
+import os
+import re
+import hmac
+import sqlite3
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from cryptography.fernet import Fernet
+
+logger = logging.getLogger(__name__)
+
+VAULT_PATH = os.environ.get("PSEUDONYM_VAULT_PATH", "/app/vault/pseudonyms.sqlite3")
+VAULT_KEY = os.environ.get("PSEUDONYM_VAULT_KEY", "")
+CACHE_SIZE = int(os.environ.get("PSEUDONYM_CACHE_SIZE", "100000"))
+
+# SQLite erlaubt max. 999 Parameter pro Statement (ältere Builds)
+_SQL_CHUNK = 500
+
+# Entity-Typen, bei denen Leerzeichen/Trenner für die Identität keine Rolle spielen
+# ("DE89 3704 0044" == "DE8937040044")
+COMPACT_ENTITIES = {
+    "DE_KVNR", "DE_IBAN", "DE_PHONE_NUMBER", "PATIENT_ID",
+    "DE_INSURANCE_NUMBER", "DE_ZIP_CODE",
+}
+_SEPARATORS = re.compile(r"[\s\-/().]+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pseudonyms (
+    lookup      BLOB PRIMARY KEY,
+    entity_type TEXT NOT NULL,
+    seq         INTEGER NOT NULL,
+    value_enc   BLOB NOT NULL,
+    UNIQUE (entity_type, seq)
+);
+CREATE TABLE IF NOT EXISTS counters (
+    entity_type TEXT PRIMARY KEY,
+    last_seq    INTEGER NOT NULL
+);
+"""
+
+
+def normalize_value(entity_type: str, value: str) -> str:
+    """
+    Normalisiert Werte für den Vergleich:
+    - NFC + casefold + Whitespace zusammenfassen
+    - bei Nummern-Entitäten zusätzlich Trennzeichen entfernen
+    """
+    s = unicodedata.normalize("NFC", value).casefold().strip()
+    if entity_type in COMPACT_ENTITIES:
+        return _SEPARATORS.sub("", s)
+    return re.sub(r"\s+", " ", s)
+
+
+def format_surrogate(prefix: str, seq: int) -> str:
+    """Lesbarer Ersatzwert, z.B. format_surrogate("Person", 123) -> "Person-000123" """
+    return f"{prefix}-{seq:06d}"
+
+
+class _LRUCache:
+    """Thread-sicherer LRU-Cache (OrderedDict)"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str]) -> Optional[int]:
+        with self._lock:
+            seq = self._data.get(key)
+            if seq is not None:
+                self._data.move_to_end(key)
+            return seq
+
+    def put(self, key: Tuple[str, str], seq: int) -> None:
+        with self._lock:
+            self._data[key] = seq
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+class PseudonymVault:
+    """
+    Bildet (Entity-Typ, Wert) stabil auf eine laufende Nummer pro Entity-Typ ab.
+
+    Args:
+        path: Pfad zur SQLite-Datei
+        key: Fernet-Schlüssel (urlsafe Base64, 32 Byte) – verschlüsselt die
+             Originalwerte und leitet den HMAC-Schlüssel für den Index ab
+        cache_size: Max. Einträge im In-Memory-LRU
+    """
+
+    def __init__(self, path: str, key: str, cache_size: int = CACHE_SIZE):
+        if not key:
+            raise ValueError("Pseudonym-Vault: Schlüssel fehlt (PSEUDONYM_VAULT_KEY)")
+        self.path = path
+        self._fernet = Fernet(key)
+        self._lookup_key = hmac.new(key.encode(), b"klinikon-vault-lookup", hashlib.sha256).digest()
+        self._cache = _LRUCache(cache_size)
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Eine Verbindung pro Thread (sqlite3-Verbindungen sind nicht thread-sicher)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _lookup(self, entity_type: str, normalized: str) -> bytes:
+        message = f"{entity_type}\x00{normalized}".encode("utf-8")
+        return hmac.new(self._lookup_key, message, hashlib.sha256).digest()
+
+    @staticmethod
+    def _select(conn: sqlite3.Connection, lookups: Sequence[bytes]) -> Dict[bytes, int]:
+        found: Dict[bytes, int] = {}
+        for i in range(0, len(lookups), _SQL_CHUNK):
+            chunk = lookups[i:i + _SQL_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT lookup, seq FROM pseudonyms WHERE lookup IN ({placeholders})", chunk
+            )
+            found.update(rows)
+        return found
+
+    def resolve(self, entries: Sequence[Tuple[str, str]]) -> List[int]:
+        """
+        Liefert für jede (entity_type, value)-Kombination die stabile laufende Nummer.
+
+        Cache-Treffer kosten keinen Datenbankzugriff; alle Fehltreffer eines Aufrufs
+        werden mit einem SELECT nachgeschlagen und neue Werte in einer einzigen
+        Transaktion angelegt.
+        """
+        keys = [(entity_type, normalize_value(entity_type, value)) for entity_type, value in entries]
+        resolved: Dict[Tuple[str, str], int] = {}
+        missing: Dict[Tuple[str, str], bytes] = {}
+        originals: Dict[Tuple[str, str], str] = {}
+
+        for key, (_, value) in zip(keys, entries):
+            if key in resolved or key in missing:
+                continue
+            originals[key] = value
+            seq = self._cache.get(key)
+            if seq is not None:
+                resolved[key] = seq
+            else:
+                missing[key] = self._lookup(*key)
+
+        if missing:
+            conn = self._connection()
+            found = self._select(conn, list(missing.values()))
+            new_keys = [key for key, lookup in missing.items() if lookup not in found]
+
+            if new_keys:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    # Erneut prüfen: ein anderer Worker kann zwischenzeitlich eingefügt haben
+                    found.update(self._select(conn, [missing[key] for key in new_keys]))
+                    for key in new_keys:
+                        lookup = missing[key]
+                        if lookup in found:
+                            continue
+                        entity_type = key[0]
+                        row = conn.execute(
+                            "INSERT INTO counters (entity_type, last_seq) VALUES (?, 1) "
+                            "ON CONFLICT(entity_type) DO UPDATE SET last_seq = last_seq + 1 "
+                            "RETURNING last_seq",
+                            (entity_type,),
+                        ).fetchone()
+                        conn.execute(
+                            "INSERT INTO pseudonyms (lookup, entity_type, seq, value_enc) VALUES (?, ?, ?, ?)",
+                            (lookup, entity_type, row[0], self._fernet.encrypt(originals[key].encode("utf-8"))),
+                        )
+                        found[lookup] = row[0]
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+                logger.info(f"Pseudonym-Vault: {len(new_keys)} neue Einträge angelegt")
+
+            for key, lookup in missing.items():
+                resolved[key] = found[lookup]
+                self._cache.put(key, found[lookup])
+
+        return [resolved[key] for key in keys]
+
+    def reidentify(self, entity_type: str, seq: int) -> Optional[str]:
+        """
+        Entschlüsselt den Originalwert hinter einem Pseudonym (z.B. PERSON, 123).
+
+        Nur für autorisierte Re-Identifikation; None, wenn das Pseudonym unbekannt ist.
+        """
+        row = self._connection().execute(
+            "SELECT value_enc FROM pseudonyms WHERE entity_type = ? AND seq = ?",
+            (entity_type, seq),
+        ).fetchone()
+        if row is None:
+            return None
+        return self._fernet.decrypt(row[0]).decode("utf-8")
+
+
+_vault: Optional[PseudonymVault] = None
+_vault_lock = threading.Lock()
+
+
+def get_vault() -> PseudonymVault:
+    """Prozessweite Vault-Instanz (lazy, damit die UI ohne Vault-Konfiguration startet)"""
+    global _vault
+    with _vault_lock:
+        if _vault is None:
+            _vault = PseudonymVault(VAULT_PATH, VAULT_KEY)
+        return _vault
@@ -0,0 +1,106 @@
+"""
+Tracing für Klinikon Pseudonymisierer (OpenTelemetry)
+Propagiert Trace-IDs (W3C traceparent) von der UI zu Analyzer und Anonymizer
+
+Konfiguration über Umgebungsvariablen:
+    TRACING_EXPORTER: "none" (Standard), "file" oder "otlp"
+    TRACING_FILE: Zieldatei für "file" (JSON-Lines)
+    OTEL_EXPORTER_OTLP_ENDPOINT: Collector für "otlp" (z.B. http://jaeger:4318)
+
+Wichtig: Span-Attribute enthalten niemals Patientendaten (PHI),
+ausschließlich Längen, Anzahlen und Zeiten. Exceptions werden deshalb nicht
+am Span aufgezeichnet (Meldungen und Stacktraces können Eingaben zitieren);
+fehlgeschlagene Spans erhalten nur das Attribut "error.type".
+"""
+
+import os
+import time
+import logging
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+from opentelemetry import trace, propagate
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+logger = logging.getLogger(__name__)
+
+TRACING_EXPORTER = os.environ.get("TRACING_EXPORTER", "none").lower()
+TRACING_FILE = os.environ.get("TRACING_FILE", "/app/traces/klinikon-presidio-ui.jsonl")
+
+# Header mit dem Sendezeitpunkt (Mikrosekunden seit Epoch), aus dem die
+# Services die Wartezeit bis zur Bearbeitung (Netzwerk + Queue) ableiten
+REQUEST_START_HEADER = "X-Request-Start"
+
+_configured = False
+
+
+def setup_tracing(service_name: str) -> None:
+    """Richtet den TracerProvider einmalig pro Prozess ein (idempotent)"""
+    global _configured
+    if _configured:
+        return
+    _configured = True
+
+    if TRACING_EXPORTER == "none":
+        return
+
+    if TRACING_EXPORTER == "file":
+        directory = os.path.dirname(TRACING_FILE)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        exporter = ConsoleSpanExporter(
+            out=open(TRACING_FILE, "a", encoding="utf-8"),
+            formatter=lambda span: span.to_json(indent=None) + "\n",
+        )
+    elif TRACING_EXPORTER == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        exporter = OTLPSpanExporter()
+    else:
+        logger.warning(f"Unbekannter TRACING_EXPORTER '{TRACING_EXPORTER}', Tracing deaktiviert")
+        return
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": os.environ.get("OTEL_SERVICE_NAME", service_name)})
+    )
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    logger.info(f"Tracing aktiv (Exporter: {TRACING_EXPORTER})")
+
+
+class _PhiSafeTracer:
+    """Tracer, dessen Spans keine Exception-Meldungen oder Stacktraces aufzeichnen"""
+
+    def __init__(self, tracer: trace.Tracer):
+        self._tracer = tracer
+
+    def __getattr__(self, name):
+        return getattr(self._tracer, name)
+
+    @contextmanager
+    def start_as_current_span(self, name: str, **kwargs) -> Iterator[trace.Span]:
+        kwargs["record_exception"] = False
+        kwargs["set_status_on_exception"] = False
+        with self._tracer.start_as_current_span(name, **kwargs) as span:
+            try:
+                yield span
+            except Exception as e:
+                # Streamlit-Steuerfluss (st.rerun/st.stop) erbt von BaseException
+                # und gilt daher nicht als Fehler
+                span.set_attribute("error.type", type(e).__name__)
+                span.set_status(trace.StatusCode.ERROR)
+                raise
+
+
+def get_tracer(name: str) -> _PhiSafeTracer:
+    """Gibt Tracer zurück (No-op, solange kein Exporter konfiguriert ist)"""
+    return _PhiSafeTracer(trace.get_tracer(name))
+
+
+def outgoing_headers() -> Dict[str, str]:
+    """Header für ausgehende Requests: aktueller Trace-Kontext + Sendezeitpunkt"""
+    headers: Dict[str, str] = {}
+    propagate.inject(headers)
+    headers[REQUEST_START_HEADER] = f"t={time.time_ns() // 1000}"
+    return headers
@@ -0,0 +1,51 @@
+"""
+Wire-Format zwischen UI und Presidio-Services
+Optionale MessagePack-Kodierung und gzip-Kompression (siehe analyzer-de/wire_format.py)
+
+Konfiguration über Umgebungsvariablen:
+    WIRE_FORMAT: "json" (Standard) oder "msgpack" – Request-Body und bevorzugte Antwort
+    WIRE_REQUEST_COMPRESSION: "none" (Standard) oder "gzip"
+    WIRE_COMPRESS_MIN_BYTES: Request-Bodies erst ab dieser Größe komprimieren
+
+Antworten werden immer anhand ihres Content-Type dekodiert; gzip-Antworten
+entpackt requests automatisch. Gegen Original-Presidio-Services (ohne
+Klinikon-Wrapper) nur mit den Standardwerten betreiben.
+"""
+
+import os
+import gzip
+import json
+from typing import Any, Dict, Tuple
+
+import msgpack
+import requests
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+
+WIRE_FORMAT = os.environ.get("WIRE_FORMAT", "json").lower()
+REQUEST_COMPRESSION = os.environ.get("WIRE_REQUEST_COMPRESSION", "none").lower()
+COMPRESS_MIN_BYTES = int(os.environ.get("WIRE_COMPRESS_MIN_BYTES", "16384"))
+GZIP_LEVEL = int(os.environ.get("WIRE_GZIP_LEVEL", "1"))
+
+
+def encode_request(payload: Dict[str, Any]) -> Tuple[bytes, Dict[str, str]]:
+    """Kodiert den Payload; liefert Body und passende Header"""
+    if WIRE_FORMAT == "msgpack":
+        body = msgpack.packb(payload)
+        headers = {"Content-Type": MSGPACK, "Accept": f"{MSGPACK}, {JSON};q=0.9"}
+    else:
+        body = json.dumps(payload).encode("utf-8")
+        headers = {"Content-Type": JSON, "Accept": JSON}
+
+    if REQUEST_COMPRESSION == "gzip" and len(body) >= COMPRESS_MIN_BYTES:
+        body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+        headers["Content-Encoding"] = "gzip"
+    return body, headers
+
+
+def decode_response(response: requests.Response) -> Any:
+    """Dekodiert die Antwort anhand des Content-Type (JSON oder MessagePack)"""
+    if response.headers.get("Content-Type", "").startswith(MSGPACK):
+        return msgpack.unpackb(response.content)
+    return response.json()
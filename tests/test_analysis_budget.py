@@ -0,0 +1,46 @@
+"""
+Tests für request_budget (analysis_budget.py): ungültige "time_budget_seconds"
+werden abgelehnt, gültige Werte nur bis zum Server-Maximum übernommen.
+
+    pip install pytest
+    python -m pytest tests/test_analysis_budget.py -q
+"""
+
+import math
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "analyzer-de"))
+
+from analysis_budget import request_budget  # noqa: E402
+
+
+@pytest.mark.parametrize(
+    "requested",
+    ["abc", "", [1], {}, True, False, 0, 0.0, "0", -1, -0.5, "-3", math.nan, "nan", math.inf, "inf"],
+)
+def test_invalid_budget_raises_type_error(requested):
+    with pytest.raises(TypeError, match="time_budget_seconds"):
+        request_budget(requested, maximum=20)
+
+
+def test_missing_budget_uses_maximum():
+    assert request_budget(None, maximum=20) == 20
+
+
+@pytest.mark.parametrize("requested, expected", [(5, 5.0), (2.5, 2.5), ("3.5", 3.5), (20, 20.0)])
+def test_budget_below_maximum_is_kept(requested, expected):
+    assert request_budget(requested, maximum=20) == expected
+
+
+@pytest.mark.parametrize("requested", [20.5, 100, "1e6"])
+def test_budget_above_maximum_is_capped(requested):
+    assert request_budget(requested, maximum=20) == 20
+
+
+def test_budget_without_server_maximum_is_not_capped():
+    assert request_budget(100, maximum=0) == 100.0
+    with pytest.raises(TypeError):
+        request_budget(-1, maximum=0)
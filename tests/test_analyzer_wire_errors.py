@@ -0,0 +1,88 @@
+"""
+Tests für die Fehlerpfade des Analyzer-Wrappers (klinikon_server.py):
+nicht dekodierbare bzw. zu große Request-Bodies liefern 400/413 als JSON.
+
+Presidios app.py und die Straßenliste liegen nur im Analyzer-Image; hier
+ersetzt ein minimaler Server mit derselben Schnittstelle (Flask-App mit
+/analyze, engine) app.py, und street_gazetteer wird ohne CSV eingehängt.
+
+    pip install pytest presidio-analyzer flask msgpack opentelemetry-sdk
+    python -m pytest tests/test_analyzer_wire_errors.py -q
+"""
+
+import gzip
+import sys
+import types
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("msgpack")
+pytest.importorskip("presidio_analyzer")
+pytest.importorskip("opentelemetry.sdk")
+
+from flask import Flask  # noqa: E402
+
+ANALYZER_DIR = Path(__file__).resolve().parent.parent / "analyzer-de"
+# Gleichnamige Module gibt es auch in UI und Anonymizer
+SHARED_MODULE_NAMES = ("klinikon_server", "tracing", "wire_format")
+
+
+class _StubServer:
+    """Schnittstelle von presidio-analyzer app.Server, soweit create_app() sie nutzt"""
+
+    def __init__(self):
+        self.app = Flask("presidio-analyzer")
+        self.app.add_url_rule("/analyze", "analyze", lambda: "", methods=["POST"])
+        self.engine = mock.MagicMock()
+        self.engine.registry.recognizers = []
+        self.engine.analyze.return_value = []
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.syspath_prepend(str(ANALYZER_DIR))
+    for name in SHARED_MODULE_NAMES:
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    monkeypatch.setitem(sys.modules, "app", types.SimpleNamespace(Server=_StubServer))
+    monkeypatch.setitem(sys.modules, "street_gazetteer", types.SimpleNamespace(GAZETTEER_INFO={}))
+    import klinikon_server
+    import wire_format
+
+    monkeypatch.setattr(wire_format, "MAX_BODY_BYTES", 1024)
+    return klinikon_server.create_app().test_client()
+
+
+def test_corrupt_gzip_body_returns_400(client):
+    resp = client.post(
+        "/analyze",
+        data=b"\x1f\x8b\x08\x00kein gzip",
+        headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+    )
+    assert resp.status_code == 400
+    assert resp.get_json() == {"error": "Invalid request body"}
+
+
+def test_corrupt_msgpack_body_returns_400(client):
+    resp = client.post("/analyze", data=b"\xc1\xc1", headers={"Content-Type": "application/msgpack"})
+    assert resp.status_code == 400
+    assert resp.get_json() == {"error": "Invalid request body"}
+
+
+def test_oversized_gzip_body_returns_413(client):
+    body = gzip.compress(b'{"text": "' + b"a" * 10_000 + b'", "language": "de"}')
+    resp = client.post(
+        "/analyze",
+        data=body,
+        headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+    )
+    assert resp.status_code == 413
+    assert resp.is_json and "too large" in resp.get_json()["error"]
+
+
+def test_invalid_time_budget_returns_400(client):
+    resp = client.post("/analyze", json={"text": "Max", "language": "de", "time_budget_seconds": -1})
+    assert resp.status_code == 400
+    assert "time_budget_seconds" in resp.get_json()["error"]
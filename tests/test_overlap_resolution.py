@@ -0,0 +1,127 @@
+"""
+Tests für resolve_overlaps (overlap_resolution.py) gegen eine zeichenweise
+Brute-Force-Referenz: gleiche Ergebnisse, disjunkte Spans, im Modus "trim"
+keine verlorenen Zeichen, Eingabe unverändert.
+
+    pip install pytest pyyaml
+    python -m pytest tests/test_overlap_resolution.py -q
+"""
+
+import copy
+import random
+import string
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "analyzer-de"))
+
+from overlap_resolution import OverlapRules, _strip, resolve_overlaps  # noqa: E402
+
+ENTITY_TYPES = ("PERSON", "DE_ZIP_CODE", "DE_KVNR", "DE_PHONE_NUMBER")
+PRIORITIES = {"DE_KVNR": 2, "PERSON": 1}
+SEEDS = range(300)
+
+
+@dataclass
+class Span:
+    """Minimaler Ersatz für RecognizerResult"""
+    entity_type: str
+    start: int
+    end: int
+    score: float
+
+
+def _random_case(seed: int, text_chars: str):
+    rnd = random.Random(seed)
+    text = "".join(rnd.choice(text_chars) for _ in range(rnd.randint(5, 80)))
+    scores = rnd.sample(range(1, 1000), rnd.randint(1, 25))      # eindeutig -> keine Ranggleichstände
+    spans = []
+    for score in scores:
+        start = rnd.randrange(len(text))
+        end = rnd.randint(start + 1, min(len(text), start + 20))
+        spans.append(Span(rnd.choice(ENTITY_TYPES), start, end, score / 1000))
+    return text, spans
+
+
+def _key(spans):
+    return sorted((s.entity_type, s.start, s.end, s.score) for s in spans)
+
+
+def _chars(spans):
+    return {i for s in spans for i in range(s.start, s.end)}
+
+
+def _brute_force(text, spans, rules):
+    """Referenz: Zeichen-Array statt Segmenten, paarweises Mischen gleicher Typen"""
+    candidates = [Span(s.entity_type, s.start, s.end, s.score) for s in spans]
+    while rules.merge_same_type:
+        pair = next(
+            ((a, b) for a in candidates for b in candidates
+             if a is not b and a.entity_type == b.entity_type and a.start < b.end and b.start < a.end),
+            None,
+        )
+        if pair is None:
+            break
+        a, b = pair
+        candidates.remove(b)
+        a.start, a.end, a.score = min(a.start, b.start), max(a.end, b.end), max(a.score, b.score)
+
+    candidates.sort(key=lambda r: (rules.priorities.get(r.entity_type, 0), r.score, r.end - r.start), reverse=True)
+    claimed = [False] * len(text)
+    accepted = []
+    for r in candidates:
+        free = [i for i in range(r.start, r.end) if not claimed[i]]
+        if rules.partial_overlaps == "drop":
+            if len(free) == r.end - r.start:
+                accepted.append(r)
+                for i in free:
+                    claimed[i] = True
+            continue
+        for i in free:
+            claimed[i] = True
+        if len(free) == r.end - r.start:
+            accepted.append(r)
+            continue
+        fragments = []
+        for i in free:
+            if fragments and fragments[-1][1] == i:
+                fragments[-1][1] = i + 1
+            else:
+                fragments.append([i, i + 1])
+        for first, last in fragments:
+            start, end = _strip(text, first, last)
+            if end - start >= rules.min_fragment_length:
+                accepted.append(Span(r.entity_type, start, end, r.score))
+    return accepted
+
+
+@pytest.mark.parametrize("partial_overlaps", ["trim", "drop"])
+@pytest.mark.parametrize("merge_same_type", [True, False])
+def test_matches_brute_force(partial_overlaps, merge_same_type):
+    rules = OverlapRules(
+        merge_same_type=merge_same_type, partial_overlaps=partial_overlaps, priorities=PRIORITIES,
+    )
+    for seed in SEEDS:
+        text, spans = _random_case(seed, string.ascii_lowercase + " ,.-")
+        before = copy.deepcopy(spans)
+
+        resolved = resolve_overlaps(text, spans, rules)
+
+        assert spans == before, f"Eingabe verändert (seed {seed})"
+        assert _key(resolved) == _key(_brute_force(text, spans, rules)), f"Abweichung (seed {seed})"
+        assert [r.start for r in resolved] == sorted(r.start for r in resolved)
+        for a, b in zip(resolved, resolved[1:]):
+            assert a.end <= b.start, f"Überlappende Spans {a} / {b} (seed {seed})"
+
+
+@pytest.mark.parametrize("merge_same_type", [True, False])
+def test_trim_keeps_every_covered_character(merge_same_type):
+    # Ohne Randzeichen und mit min_fragment_length=1 darf "trim" nichts verlieren
+    rules = OverlapRules(merge_same_type=merge_same_type, min_fragment_length=1, priorities=PRIORITIES)
+    for seed in SEEDS:
+        text, spans = _random_case(seed, string.ascii_lowercase)
+        resolved = resolve_overlaps(text, spans, rules)
+        assert _chars(resolved) == _chars(spans), f"Zeichen nicht mehr abgedeckt (seed {seed})"
@@ -0,0 +1,104 @@
+"""
+Tests für den Pseudonym-Vault: konsistente Nummernvergabe bei gleichzeitigen
+Batch-Workern (Threads und Prozesse auf einer SQLite-Datei) und Re-Identifikation.
+
+    pip install pytest cryptography
+    python -m pytest tests/test_pseudonym_vault.py -q
+"""
+
+import multiprocessing
+import random
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+from cryptography.fernet import Fernet
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "klinikon-presidio-ui"))
+
+from pseudonym_vault import PseudonymVault  # noqa: E402
+
+WORKERS = 6
+ENTRIES = (
+    [("PERSON", f"Patient {i}") for i in range(150)]
+    + [("DE_IBAN", f"DE89 3704 0044 0532 0{i:05d}") for i in range(150)]
+)
+
+
+def _resolve_batches(path: str, key: str, seed: int):
+    """Ein Batch-Worker: löst alle Einträge in eigener Reihenfolge und in kleinen Bündeln auf"""
+    vault = PseudonymVault(path, key, cache_size=10)
+    entries = list(ENTRIES)
+    random.Random(seed).shuffle(entries)
+    mapping = {}
+    for i in range(0, len(entries), 7):
+        batch = entries[i:i + 7]
+        mapping.update(zip(batch, vault.resolve(batch)))
+    return mapping
+
+
+def _assert_consistent(mappings):
+    first = mappings[0]
+    assert all(m == first for m in mappings), "Worker haben unterschiedliche Nummern erhalten"
+    for entity_type in ("PERSON", "DE_IBAN"):
+        seqs = sorted(seq for (etype, _), seq in first.items() if etype == entity_type)
+        assert seqs == list(range(1, 151)), f"Lücken oder Dubletten bei {entity_type}"
+
+
+@pytest.fixture
+def vault_path(tmp_path):
+    return str(tmp_path / "pseudonyms.sqlite3")
+
+
+@pytest.fixture
+def key():
+    return Fernet.generate_key().decode()
+
+
+def test_concurrent_threads_assign_consistent_numbers(vault_path, key):
+    results = [None] * WORKERS
+    barrier = threading.Barrier(WORKERS)
+
+    def worker(i):
+        barrier.wait()
+        results[i] = _resolve_batches(vault_path, key, seed=i)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(WORKERS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    _assert_consistent(results)
+
+
+def test_concurrent_processes_assign_consistent_numbers(vault_path, key):
+    PseudonymVault(vault_path, key)                      # Schema vorab anlegen
+    with multiprocessing.get_context("spawn").Pool(WORKERS) as pool:
+        results = pool.starmap(_resolve_batches, [(vault_path, key, i) for i in range(WORKERS)])
+
+    _assert_consistent(results)
+
+
+def test_separators_and_case_map_to_same_pseudonym(vault_path, key):
+    vault = PseudonymVault(vault_path, key)
+    seqs = vault.resolve([
+        ("DE_IBAN", "DE89 3704 0044 0532 0130 00"),
+        ("DE_IBAN", "de89370400440532013000"),
+        ("PERSON", "Max  Mustermann"),
+        ("PERSON", "max mustermann"),
+    ])
+    assert seqs[0] == seqs[1]
+    assert seqs[2] == seqs[3]
+
+
+def test_reidentify_returns_first_seen_original(vault_path, key):
+    vault = PseudonymVault(vault_path, key)
+    seq, again = vault.resolve([("DE_IBAN", "DE89 3704 0044 0532 0130 00"), ("DE_IBAN", "DE89370400440532013000")])
+
+    assert seq == again
+    assert vault.reidentify("DE_IBAN", seq) == "DE89 3704 0044 0532 0130 00"
+    assert PseudonymVault(vault_path, key).reidentify("DE_IBAN", seq) == "DE89 3704 0044 0532 0130 00"
+    assert vault.reidentify("DE_IBAN", seq + 1) is None
+    assert vault.reidentify("PERSON", seq) is None